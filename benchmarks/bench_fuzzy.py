@@ -0,0 +1,95 @@
+# bench_fuzzy.py
+"""
+Compares the exhaustive fuzzy scan against the bigram FuzzyIndex on the
+bundled card_db lists, and checks that both return the same matches.
+
+    python benchmarks/bench_fuzzy.py [--queries 500] [--seed 1]
+"""
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from rapidfuzz import fuzz, process  # noqa: E402
+
+from fuzzy_index import FuzzyIndex  # noqa: E402
+from fuzzy_utils import load_card_list  # noqa: E402
+
+TCG_LISTS = ["Pokemon Name", "YuGiOh Card Name", "MTG Card Name"]
+THRESHOLD = 70
+
+
+def add_ocr_noise(name, rng):
+    """Simulates OCR damage: substitutions, drops, inserts and stray characters."""
+    chars = list(name)
+    for _ in range(rng.randint(0, max(1, len(chars) // 4))):
+        op = rng.random()
+        pos = rng.randrange(len(chars) + 1)
+        if op < 0.4 and pos < len(chars):
+            chars[pos] = rng.choice(string.ascii_letters + "01|!")
+        elif op < 0.7 and pos < len(chars):
+            del chars[pos]
+        else:
+            chars.insert(pos, rng.choice(string.ascii_letters + " .,'"))
+    return "".join(chars)
+
+
+def make_queries(names, count, rng):
+    queries = [add_ocr_noise(rng.choice(names), rng) for _ in range(count * 9 // 10)]
+    # Pure garbage, as OCR on an empty or misaligned box produces
+    for _ in range(count - len(queries)):
+        queries.append("".join(rng.choice(string.printable[:94]) for _ in range(rng.randint(1, 25))))
+    return queries
+
+
+def exhaustive(query, names):
+    match, score, idx = process.extractOne(query, names, scorer=fuzz.ratio)
+    return (match, score, idx) if score >= THRESHOLD else None
+
+
+def run(tcgtag, query_count, rng):
+    names = load_card_list(tcgtag)
+    queries = make_queries(names, query_count, rng)
+
+    start = time.perf_counter()
+    index = FuzzyIndex.build(names)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = [exhaustive(q, names) for q in queries]
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [index.extract_one(q, score_cutoff=THRESHOLD) for q in queries]
+    index_time = time.perf_counter() - start
+
+    mismatches = [(q, e, a) for q, e, a in zip(queries, expected, actual) if e != a]
+
+    print(f"{tcgtag} ({len(names)} names, {len(queries)} queries)")
+    print(f"  index build: {build_time * 1000:.0f} ms")
+    print(f"  exhaustive:  {scan_time * 1000 / len(queries):.3f} ms/query")
+    print(f"  indexed:     {index_time * 1000 / len(queries):.3f} ms/query "
+          f"({scan_time / index_time:.1f}x)")
+    print(f"  mismatches:  {len(mismatches)}")
+    for query, exp, act in mismatches[:5]:
+        print(f"    {query!r}: exhaustive={exp} indexed={act}")
+    return not mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    ok = all([run(tcgtag, args.queries, rng) for tcgtag in TCG_LISTS])
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
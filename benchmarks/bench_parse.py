@@ -0,0 +1,66 @@
+# bench_parse.py
+"""
+Compares the eBay result page parsers (lxml single pass vs BeautifulSoup)
+on saved or generated result pages, and checks that both extract the same
+prices.
+
+    python benchmarks/bench_parse.py [--fixtures DIR] [--pages 20] [--max-items 10]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from ebay_provider import HAS_LXML, parse_ebay_prices_lxml, parse_ebay_prices_soup  # noqa: E402
+from ebay_standin import load_fixtures, make_results_page  # noqa: E402
+
+PARSERS = {"soup": parse_ebay_prices_soup, "lxml": parse_ebay_prices_lxml}
+
+
+def time_parser(parse, pages, max_items, repeat):
+    """Best-of-`repeat` seconds per page, and the prices of each page."""
+    times, results = [], []
+    for html in pages:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            prices = parse(html, max_items)
+            best = min(best, time.perf_counter() - start)
+        times.append(best)
+        results.append(prices)
+    return times, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixtures", help="directory of saved eBay result pages (*.html)")
+    parser.add_argument("--pages", type=int, default=20, help="pages to generate without --fixtures")
+    parser.add_argument("--max-items", type=int, nargs="+", default=[10, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not HAS_LXML:
+        sys.exit("lxml is not installed (pip install lxml)")
+    pages = load_fixtures(args.fixtures) if args.fixtures else [make_results_page(f"Card {i}") for i in range(args.pages)]
+    page_kb = sum(len(page) for page in pages) / len(pages) / 1024
+    print(f"{len(pages)} pages, {page_kb:.0f} KB average")
+
+    ok = True
+    for max_items in args.max_items:
+        timings, results = {}, {}
+        for name, parse in PARSERS.items():
+            times, results[name] = time_parser(parse, pages, max_items, args.repeat)
+            timings[name] = sum(times) / len(times)
+        mismatches = sum(a != b for a, b in zip(results["soup"], results["lxml"]))
+        ok &= not mismatches
+        print(f"max_items={max_items}")
+        print(f"  soup: {timings['soup'] * 1000:.2f} ms/page")
+        print(f"  lxml: {timings['lxml'] * 1000:.2f} ms/page ({timings['soup'] / timings['lxml']:.1f}x)")
+        print(f"  mismatches: {mismatches}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
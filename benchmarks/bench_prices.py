@@ -0,0 +1,215 @@
+# bench_prices.py
+"""
+Drives the price lookup pipeline (update_csv_with_prices + eBay provider)
+end to end against a local eBay stand-in and reports rows/sec, lookup
+latency and page parse time.
+
+    python benchmarks/bench_prices.py [--rows 300] [--unique 150] [--workers 4] [--latency-ms 80]
+    python benchmarks/bench_prices.py --json results.json           # save results
+    python benchmarks/bench_prices.py --baseline results.json       # exit 1 on regression
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from ebay_provider import EbayMedianProvider, EbayLastSoldProvider, EbayTrimmedMeanProvider, parse_ebay_prices  # noqa: E402
+from ebay_standin import EbayStandIn, load_fixtures  # noqa: E402
+from fuzzy_utils import load_card_list  # noqa: E402
+from price_aggregator import PriceAggregator  # noqa: E402
+from price_lookup import update_csv_with_prices  # noqa: E402
+from price_providers import PriceProvider  # noqa: E402
+
+STRATEGIES = [EbayMedianProvider, EbayLastSoldProvider, EbayTrimmedMeanProvider]
+PROVIDERS = {
+    "median": EbayMedianProvider,
+    "last-sold": EbayLastSoldProvider,
+    "trimmed-mean": EbayTrimmedMeanProvider,
+    "all": lambda search_url: PriceAggregator([cls(search_url) for cls in STRATEGIES]),
+}
+COLUMN = "Fuzzy Name"
+# fetch_ebay_prices searches for "<name> trading card"
+SEARCH_SUFFIX = " trading card"
+# Metrics checked against --baseline, and whether higher is better
+REGRESSION_METRICS = {
+    "rows_per_sec": True,
+    "latency_p95_ms": False,
+    "parse_p50_ms": False,
+}
+
+
+class TimedProvider(PriceProvider):
+    """Records the wall time of every lookup made through `provider`."""
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.latencies = []
+        self._lock = threading.Lock()
+
+    def name(self):
+        return self.provider.name()
+
+    def attach_stats(self, stats):
+        self.stats = stats
+        self.provider.attach_stats(stats)
+
+    def attach_limiter(self, limiter):
+        self.limiter = limiter
+        self.provider.attach_limiter(limiter)
+
+    def close(self):
+        self.provider.close()
+
+    def price_names(self):
+        return self.provider.price_names()
+
+    def fetch_price(self, card_name):
+        return self.fetch_prices(card_name)[0]
+
+    def fetch_prices(self, card_name):
+        start = time.perf_counter()
+        try:
+            return self.provider.fetch_prices(card_name)
+        finally:
+            with self._lock:
+                self.latencies.append(time.perf_counter() - start)
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def write_csv(path, rows, unique, rng):
+    names = load_card_list("MTG Card Name")
+    terms = rng.sample(names, unique)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Input File Path", COLUMN])
+        for i in range(rows):
+            # Every term at least once, the rest repeats as in a real scan
+            writer.writerow([f"scan_{i}.jpg", terms[i] if i < unique else rng.choice(terms)])
+    return terms
+
+
+def time_parsing(pages, repeat):
+    """Per-page parse time (seconds) of parse_ebay_prices over `pages`."""
+    times = []
+    for html in pages:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parse_ebay_prices(html)
+            best = min(best, time.perf_counter() - start)
+        times.append(best)
+    return times
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    standin = EbayStandIn(
+        fixtures=load_fixtures(args.fixtures) if args.fixtures else None,
+        latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+        throttle_rate=args.throttle_rate, retry_after=args.retry_after, seed=args.seed,
+    )
+    with standin, tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "Scanning-Report-bench.csv"
+        terms = write_csv(csv_path, args.rows, min(args.unique, args.rows), rng)
+        standin.warm(term + SEARCH_SUFFIX for term in terms)
+        provider = TimedProvider(PROVIDERS[args.provider](search_url=standin.url))
+        summary = {}
+
+        start = time.perf_counter()
+        # The pipeline prints every lookup; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            update_csv_with_prices(csv_path, provider, COLUMN, workers=args.workers, rate_limit=args.rate_limit, summary=summary)
+        wall = time.perf_counter() - start
+
+        pages = list(standin.pages().values())[:args.parse_pages]
+        parse_times = time_parsing(pages, args.parse_repeat)
+
+    latencies = provider.latencies
+    return {
+        "rows": summary["rows"],
+        "lookups": len(latencies),
+        "priced": summary["priced"],
+        "workers": args.workers,
+        "wall_seconds": round(wall, 3),
+        "rows_per_sec": round(summary["rows"] / wall, 2),
+        "latency_p50_ms": round(1000 * percentile(latencies, 50), 2),
+        "latency_p95_ms": round(1000 * percentile(latencies, 95), 2),
+        "parse_p50_ms": round(1000 * percentile(parse_times, 50), 3),
+        "parse_p95_ms": round(1000 * percentile(parse_times, 95), 3),
+        "page_kb": round(sum(len(p) for p in pages) / max(1, len(pages)) / 1024, 1),
+        "requests": standin.requests,
+        "throttled": standin.throttled,
+        "stages": summary["stages"],
+    }
+
+
+def check_baseline(results, baseline, tolerance, metrics=REGRESSION_METRICS):
+    """Returns a message per metric that regressed by more than `tolerance` (a fraction)."""
+    failures = []
+    for metric, higher_is_better in metrics.items():
+        if metric not in baseline:
+            continue
+        old, new = baseline[metric], results[metric]
+        limit = old * (1 - tolerance) if higher_is_better else old * (1 + tolerance)
+        if (new < limit) if higher_is_better else (new > limit):
+            failures.append(f"{metric}: {new} vs baseline {old} (limit {limit:.3f})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=300)
+    parser.add_argument("--unique", type=int, default=150, help="distinct search terms among the rows")
+    parser.add_argument("--provider", choices=sorted(PROVIDERS), default="median")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate-limit", type=float, default=1000.0, help="requests per second (the app defaults to 1)")
+    parser.add_argument("--fixtures", help="directory of saved eBay result pages (*.html) to serve")
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--parse-pages", type=int, default=20, help="served pages to time the parser on")
+    parser.add_argument("--parse-repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression against the baseline (fraction)")
+    args = parser.parse_args()
+
+    results = run(args)
+    print(f"{results['rows']} rows, {results['lookups']} lookups on {results['workers']} workers "
+          f"in {results['wall_seconds']:.2f}s ({results['rows_per_sec']:.1f} rows/s)")
+    print(f"  lookup latency: p50 {results['latency_p50_ms']:.1f} ms, p95 {results['latency_p95_ms']:.1f} ms")
+    print(f"  parse:          p50 {results['parse_p50_ms']:.2f} ms, p95 {results['parse_p95_ms']:.2f} ms "
+          f"per {results['page_kb']:.0f} KB page")
+    print(f"  stand-in:       {results['requests']} requests, {results['throttled']} answered 429; "
+          f"{results['priced']} rows priced")
+    for stage, totals in results["stages"].items():
+        print(f"  {stage:<16}{totals['count']:6d} x  p50 {totals['p50_ms']:8.2f} ms, p95 {totals['p95_ms']:8.2f} ms")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.baseline:
+        failures = check_baseline(results, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# bench_scan.py
+"""
+Runs the full scan pipeline headlessly on synthetic card photos and reports
+images/sec, time per stage, peak memory and OCR / fuzzy match accuracy.
+
+Cards are rendered offline with names drawn from the card_db lists, then
+photographed: placed on a background, rotated, blurred and given sensor
+noise. The ground truth name of every image is known.
+
+    python benchmarks/bench_scan.py [--images 100] [--workers 4] [--rotate 4] [--preprocess standard]
+    python benchmarks/bench_scan.py --json results.json          # save results
+    python benchmarks/bench_scan.py --baseline results.json      # exit 1 on regression
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import numpy as np  # noqa: E402
+from PIL import Image, ImageDraw, ImageFilter, ImageFont  # noqa: E402
+
+from bench_prices import check_baseline  # noqa: E402
+from card_alignment import CARD_SIZE, HAS_CV2  # noqa: E402
+from fuzzy_utils import load_card_list  # noqa: E402
+from price_providers import normalize_search_term  # noqa: E402
+from scan_pipeline import run_scan  # noqa: E402
+
+TCGTAG = "MTG Card Name"
+# Name box of the rendered card, in card frame pixels
+NAME_BOX = (40, 36, 710, 110)
+FONT_NAMES = ["DejaVuSans-Bold.ttf", "arialbd.ttf", "Arial Bold.ttf", "LiberationSans-Bold.ttf"]
+REGRESSION_METRICS = {
+    "images_per_sec": True,
+    "ocr_accuracy": True,
+    "fuzzy_accuracy": True,
+}
+
+
+def load_font(size):
+    for name in FONT_NAMES:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+def render_card(name, rng, font):
+    """A card face in the canonical frame: coloured border, name bar, art box and rules text."""
+    width, height = CARD_SIZE
+    border = tuple(rng.randint(20, 90) for _ in range(3))
+    card = Image.new("RGB", CARD_SIZE, border)
+    draw = ImageDraw.Draw(card)
+    inner = tuple(rng.randint(170, 235) for _ in range(3))
+    draw.rounded_rectangle((24, 24, width - 24, height - 24), radius=18, fill=inner)
+    draw.rectangle(NAME_BOX, fill=(238, 234, 226), outline=(40, 40, 40), width=3)
+    draw.text((NAME_BOX[0] + 16, (NAME_BOX[1] + NAME_BOX[3]) // 2), name, fill=(10, 10, 10), font=font, anchor="lm")
+    art = (50, 130, width - 50, 600)
+    draw.rectangle(art, fill=tuple(rng.randint(0, 255) for _ in range(3)))
+    for _ in range(12):
+        x, y = rng.randint(art[0], art[2]), rng.randint(art[1], art[3])
+        r = rng.randint(10, 90)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=tuple(rng.randint(0, 255) for _ in range(3)))
+    draw.rectangle((50, 630, width - 50, height - 60), fill=(245, 242, 236), outline=(40, 40, 40), width=2)
+    for line in range(6):
+        words = " ".join(rng.choice(["Flying", "Draw a card", "Target creature", "gets +1/+1", "until end of turn", "Tap:"]) for _ in range(3))
+        draw.text((70, 660 + line * 50), words, fill=(30, 30, 30), font=font.font_variant(size=22))
+    return card
+
+
+def photograph(card, rng, rotate, blur, noise, aligned):
+    """Places the card in a photo: background margin, rotation, blur and noise."""
+    if aligned:
+        margin = rng.randint(80, 220)
+        background = tuple(rng.randint(0, 255) for _ in range(3))
+        photo = Image.new("RGB", (card.width + 2 * margin, card.height + 2 * margin), background)
+        shifted = Image.new("RGBA", card.size)
+        shifted.paste(card)
+        rotated = shifted.rotate(rng.uniform(-rotate, rotate), resample=Image.BICUBIC, expand=True)
+        offset = ((photo.width - rotated.width) // 2 + rng.randint(-20, 20), (photo.height - rotated.height) // 2 + rng.randint(-20, 20))
+        photo.paste(rotated, offset, rotated)
+    else:
+        # A flatbed-style scan: the card fills the image, only slightly askew
+        photo = card.rotate(rng.uniform(-1, 1), resample=Image.BICUBIC, fillcolor=card.getpixel((2, 2)))
+    if blur:
+        photo = photo.filter(ImageFilter.GaussianBlur(rng.uniform(0, blur)))
+    if noise:
+        pixels = np.asarray(photo, dtype=np.int16)
+        pixels = pixels + np.random.default_rng(rng.getrandbits(32)).normal(0, noise, pixels.shape).astype(np.int16)
+        photo = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    return photo
+
+
+def generate_images(out_dir, count, rng, args):
+    names = load_card_list(TCGTAG)
+    font = load_font(40)
+    truth = {}
+    for i in range(count):
+        name = rng.choice(names)
+        photo = photograph(render_card(name, rng, font), rng, args.rotate, args.blur, args.noise, args.align)
+        path = out_dir / f"card_{i:05d}.jpg"
+        photo.save(path, quality=90)
+        truth[path.name] = name
+    return truth
+
+
+def peak_rss_mb():
+    """(this process, largest finished child process) peak RSS in MB, or None where unsupported."""
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    # ru_maxrss is KB on Linux, bytes on macOS
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return (round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit, 1),
+            round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit, 1))
+
+
+def score(csv_path, truth):
+    ocr_hits = fuzzy_hits = 0
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            expected = normalize_search_term(truth[Path(row["Input File Path"]).name])
+            ocr_hits += normalize_search_term(row["Name"]) == expected
+            fuzzy_hits += normalize_search_term(row["Fuzzy Name"]) == expected
+    return ocr_hits / len(truth), fuzzy_hits / len(truth)
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        in_dir, out_dir = Path(tmp) / "in", Path(tmp) / "out"
+        in_dir.mkdir()
+        truth = generate_images(in_dir, args.images, rng, args)
+        images = sorted(in_dir.glob("*.jpg"))
+        capture_data = [("Name", NAME_BOX, TCGTAG)]
+
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            summary = run_scan(
+                images, out_dir, capture_data, workers=args.workers, backend=args.backend,
+                fuzzy_mode=args.fuzzy_mode, resume=False, preprocess=args.preprocess, align=args.align,
+            )
+        ocr_accuracy, fuzzy_accuracy = score(summary["csv_path"], truth)
+
+    rss_main, rss_workers = peak_rss_mb()
+    elapsed = summary["elapsed_seconds"]
+    return {
+        "images": summary["images"],
+        "workers": args.workers,
+        "align": args.align,
+        "preprocess": args.preprocess,
+        "elapsed_seconds": elapsed,
+        "images_per_sec": round(summary["images"] / elapsed, 2) if elapsed else 0.0,
+        "stages": summary["stages"],
+        "peak_rss_mb": rss_main,
+        "peak_worker_rss_mb": rss_workers,
+        "ocr_accuracy": round(ocr_accuracy, 4),
+        "fuzzy_accuracy": round(fuzzy_accuracy, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--backend", choices=["auto", "tesserocr", "pytesseract"], default="auto")
+    parser.add_argument("--fuzzy-mode", choices=["indexed", "batch"], default="indexed")
+    parser.add_argument("--preprocess", default="standard", help="preset or comma-separated steps")
+    parser.add_argument("--align", action=argparse.BooleanOptionalAction, default=HAS_CV2,
+                        help="photograph cards on a background and align them (needs OpenCV)")
+    parser.add_argument("--rotate", type=float, default=4.0, help="maximum card rotation in degrees when aligning")
+    parser.add_argument("--blur", type=float, default=1.0, help="maximum Gaussian blur radius")
+    parser.add_argument("--noise", type=float, default=6.0, help="sensor noise standard deviation")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression against the baseline (fraction)")
+    args = parser.parse_args()
+    if args.preprocess and "," in args.preprocess:
+        args.preprocess = [step.strip() for step in args.preprocess.split(",")]
+
+    results = run(args)
+    print(f"{results['images']} images on {results['workers']} workers in {results['elapsed_seconds']:.2f}s "
+          f"({results['images_per_sec']:.2f} images/s, align={results['align']})")
+    for stage, totals in results["stages"].items():
+        ms = 1000 * totals["seconds"] / totals["count"] if totals["count"] else 0.0
+        print(f"  {stage:<28} {totals['seconds']:8.2f}s  {ms:8.2f} ms x {totals['count']}")
+    if results["peak_rss_mb"] is not None:
+        print(f"  peak RSS: {results['peak_rss_mb']:.0f} MB main, {results['peak_worker_rss_mb']:.0f} MB largest worker")
+    print(f"  accuracy: OCR {results['ocr_accuracy']:.1%}, fuzzy {results['fuzzy_accuracy']:.1%}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        failures = check_baseline(results, baseline, args.tolerance, REGRESSION_METRICS)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# ebay_standin.py
+"""
+Local HTTP stand-in for eBay's sold-listings search, for benchmarking the
+price lookup path without touching the live site.
+
+Pages are served from saved result pages (--fixtures DIR, *.html) or,
+without fixtures, generated per search term in eBay's result markup.
+Latency, jitter and 429 responses can be injected.
+
+    python benchmarks/ebay_standin.py [--port 8765] [--latency-ms 80] [--throttle-rate 0.05]
+    python benchmarks/ebay_standin.py --save DIR [--pages 20]   # write generated pages as fixtures
+"""
+import argparse
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+SEARCH_PATH = "/sch/i.html"
+ITEMS_PER_PAGE = 60
+# Real result pages carry ~200 KB of inline script, style and tracking markup
+PAGE_FILLER_BYTES = 150_000
+
+CONDITIONS = ["Near Mint", "Lightly Played", "Moderately Played", "Heavily Played", "Damaged"]
+EXTRAS = ["Holo", "Foil", "1st Edition", "Unlimited", "Promo", "Rare", "PSA 9", "NM"]
+
+
+def make_results_page(term, items=ITEMS_PER_PAGE, filler_bytes=PAGE_FILLER_BYTES):
+    """
+    A sold-listings results page for `term`, shaped like eBay's: the "Shop
+    on eBay" placeholder, sponsored items (in every AD_MARKERS form), lots
+    and bundles, discounted (strikethrough) prices and ordinary sales.
+    Same term, same page.
+    """
+    rng = random.Random(zlib.crc32(term.encode("utf-8")))
+    base_price = rng.uniform(0.5, 200)
+    listings = [item_html(0, "Shop on eBay", "$20.00", rng)]
+    for i in range(1, items):
+        title = f"{term} {rng.choice(EXTRAS)} {rng.choice(CONDITIONS)}"
+        roll = rng.random()
+        if roll < 0.08:
+            title = f"Lot of {rng.randint(3, 50)} {term} cards"
+        elif roll < 0.12:
+            title = f"{term} bundle + sleeves"
+        price = f"${base_price * rng.uniform(0.7, 1.4):,.2f}"
+        listings.append(item_html(i, title, price, rng, sponsored=rng.random() < 0.05, discounted=rng.random() < 0.1))
+
+    filler = []
+    size = 0
+    while size < filler_bytes:
+        chunk = f"window.__srp_{len(filler)}={{\"k\":\"{rng.getrandbits(128):032x}\",\"v\":[{','.join(str(rng.randint(0, 9999)) for _ in range(40))}]}};\n"
+        filler.append(chunk)
+        size += len(chunk)
+
+    return (
+        "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\">"
+        f"<title>{term} trading card for sale | eBay</title>"
+        "<style>.s-item{display:block}.s-item__price{font-weight:700}.STRIKETHROUGH{text-decoration:line-through}</style>"
+        f"<script>{''.join(filler)}</script></head><body>"
+        "<div id=\"srp-river-results\" class=\"srp-river-results clearfix\"><ul class=\"srp-results srp-list clearfix\">"
+        + "".join(listings)
+        + "</ul></div></body></html>"
+    )
+
+
+# The ways eBay renders the sponsored marker: whole, split across spans,
+# and after one of its <!--F#...--> comments
+AD_MARKERS = [
+    "<span role=\"text\">AdChoice</span>",
+    "<span role=\"text\"><span>Ad</span><span>Choice</span></span>",
+    "<span role=\"text\"><!--F#f_0-->AdChoice<!--F/--></span>",
+]
+
+
+def item_html(i, title, price, rng, sponsored=False, discounted=False):
+    ad = f"<span class=\"s-item__sep\">{AD_MARKERS[i % len(AD_MARKERS)]}</span>" if sponsored else ""
+    strike = f"<span class=\"STRIKETHROUGH\">${rng.uniform(5, 300):,.2f}</span>" if discounted else ""
+    return (
+        f"<li class=\"s-item s-item__pl-on-bottom\" data-viewport='{{\"trackableId\":\"{rng.getrandbits(64):016x}\"}}' id=\"item{i:x}\">"
+        "<div class=\"s-item__wrapper clearfix\"><div class=\"s-item__image-section\"><div class=\"s-item__image\">"
+        f"<a href=\"https://www.ebay.com/itm/{rng.randint(10**11, 10**12)}\"><img src=\"https://i.ebayimg.com/images/g/{i}/s-l225.webp\" alt=\"{title}\"></a>"
+        "</div></div><div class=\"s-item__info clearfix\">"
+        f"<div class=\"s-item__caption\"><span class=\"s-item__caption--signal POSITIVE\">Sold  Oct {rng.randint(1, 28)}, 2026</span></div>"
+        f"<a class=\"s-item__link\" href=\"https://www.ebay.com/itm/{i}\"><div class=\"s-item__title\"><span role=\"heading\" aria-level=\"3\">{title}</span></div></a>"
+        f"<div class=\"s-item__subtitle\"><span class=\"SECONDARY_INFO\">Pre-Owned</span></div>"
+        "<div class=\"s-item__details clearfix\"><div class=\"s-item__detail s-item__detail--primary\">"
+        f"<span class=\"s-item__price\"><span class=\"POSITIVE\">{price}</span></span>{strike}</div>"
+        f"<div class=\"s-item__detail s-item__detail--primary\"><span class=\"s-item__shipping s-item__logisticsCost\">+${rng.uniform(0, 6):.2f} shipping</span></div>"
+        f"{ad}</div></div></div></li>"
+    )
+
+
+def load_fixtures(directory):
+    pages = [path.read_text(encoding="utf-8") for path in sorted(Path(directory).glob("*.html"))]
+    if not pages:
+        raise FileNotFoundError(f"No *.html fixtures in {directory}")
+    return pages
+
+
+class EbayStandIn:
+    """
+    Threaded local server answering eBay search URLs.
+
+    `latency` (+/- `jitter`) seconds are slept before each response, and a
+    `throttle_rate` fraction of requests get 429 Too Many Requests with a
+    Retry-After header. Counters are kept for the benchmark report.
+    """
+
+    def __init__(self, fixtures=None, latency=0.0, jitter=0.0, throttle_rate=0.0, retry_after=1, seed=1, port=0):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.requests = self.throttled = self.bytes_sent = 0
+        self._rng = random.Random(seed)
+        self._pages = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{SEARCH_PATH}"
+
+    def page(self, term):
+        """The page served for a search term."""
+        with self._lock:
+            page = self._pages.get(term)
+        if page is None:
+            if self.fixtures:
+                page = self.fixtures[zlib.crc32(term.encode("utf-8")) % len(self.fixtures)]
+            else:
+                page = make_results_page(term)
+            with self._lock:
+                page = self._pages.setdefault(term, page)
+        return page
+
+    def warm(self, terms):
+        """Builds the pages for `terms` up front so generating them is not timed as latency."""
+        for term in terms:
+            self.page(term)
+
+    def pages(self):
+        with self._lock:
+            return dict(self._pages)
+
+    def _respond(self, request):
+        url = urlparse(request.path)
+        if url.path != SEARCH_PATH:
+            request.send_error(404)
+            return
+        term = parse_qs(url.query).get("_nkw", [""])[0]
+        with self._lock:
+            self.requests += 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            throttle = self._rng.random() < self.throttle_rate
+            if throttle:
+                self.throttled += 1
+        time.sleep(delay)
+
+        if throttle:
+            request.send_response(429)
+            request.send_header("Retry-After", str(self.retry_after))
+            request.send_header("Content-Length", "0")
+            request.end_headers()
+            return
+        body = self.page(term).encode("utf-8")
+        request.send_response(200)
+        request.send_header("Content-Type", "text/html; charset=utf-8")
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+        with self._lock:
+            self.bytes_sent += len(body)
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real site
+
+            def do_GET(self):
+                standin._respond(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", help="directory of saved result pages (*.html) to serve")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--throttle-rate", type=float, default=0, help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with a 429")
+    parser.add_argument("--save", help="write generated result pages to this directory and exit")
+    parser.add_argument("--pages", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.save:
+        out = Path(args.save)
+        out.mkdir(parents=True, exist_ok=True)
+        for i in range(args.pages):
+            (out / f"results_{i:03d}.html").write_text(make_results_page(f"Card {i}"), encoding="utf-8")
+        print(f"Wrote {args.pages} pages to {out}")
+        return
+
+    standin = EbayStandIn(
+        fixtures=load_fixtures(args.fixtures) if args.fixtures else None,
+        latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+        throttle_rate=args.throttle_rate, retry_after=args.retry_after, port=args.port,
+    )
+    print(f"Serving eBay stand-in at {standin.url} (Ctrl+C to stop)")
+    try:
+        standin._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# card_alignment.py
+import numpy as np
+from PIL import Image
+
+try:
+    import cv2
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+
+# Canonical card frame (63 x 88 mm at ~300 dpi). Aligned templates store
+# boxes as fractions of this frame.
+CARD_SIZE = (750, 1050)
+CARD_ASPECT = CARD_SIZE[1] / CARD_SIZE[0]
+ASPECT_TOLERANCE = 0.2
+# Photos are decoded at reduced size as long as the short side stays this
+# long, leaving enough pixels for a card covering half of it
+ALIGN_MIN_SIDE = 2 * CARD_SIZE[0]
+# Detection runs on a copy scaled to this long side; corners are scaled back
+DETECT_LONG_SIDE = 640
+# The card must cover at least this fraction of the photo
+MIN_CARD_AREA = 0.1
+# A quad with every corner this close (as a fraction of the side) to the
+# photo's corners spans the whole photo
+EDGE_MARGIN = 0.06
+
+
+def order_corners(points):
+    """Orders 4 points as top-left, top-right, bottom-right, bottom-left."""
+    points = np.asarray(points, dtype=np.float32).reshape(4, 2)
+    sums, diffs = points.sum(axis=1), np.diff(points, axis=1).ravel()
+    return np.array([
+        points[np.argmin(sums)], points[np.argmin(diffs)],
+        points[np.argmax(sums)], points[np.argmax(diffs)],
+    ], dtype=np.float32)
+
+
+def card_like(corners):
+    tl, tr, br, bl = corners
+    width = (np.linalg.norm(tr - tl) + np.linalg.norm(br - bl)) / 2
+    height = (np.linalg.norm(bl - tl) + np.linalg.norm(br - tr)) / 2
+    return width > 0 and abs(height / width - CARD_ASPECT) <= ASPECT_TOLERANCE * CARD_ASPECT
+
+
+def detect_card(gray):
+    """
+    Finds the card outline in a grayscale photo.
+
+    Returns the 4 corners (top-left first, clockwise) in `gray`'s pixel
+    coordinates, or None when no upright card-shaped quad is found or the
+    card already fills the photo.
+    """
+    height, width = gray.shape[:2]
+    scale = min(1.0, DETECT_LONG_SIDE / max(height, width))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else gray
+
+    edges = cv2.Canny(cv2.GaussianBlur(small, (5, 5), 0), 50, 150)
+    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+    contours, _ = cv2.findContours(edges, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+
+    min_area = MIN_CARD_AREA * small.shape[0] * small.shape[1]
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:10]:
+        if cv2.contourArea(contour) < min_area:
+            break
+        quad = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(quad) != 4:
+            # Rounded corners or a chipped edge; fall back to the bounding rectangle
+            quad = cv2.boxPoints(cv2.minAreaRect(contour))
+        corners = np.clip(order_corners(quad) / scale, 0, [width - 1, height - 1]).astype(np.float32)
+        if card_like(corners):
+            # Spanning the whole photo means a tightly cropped scan, and the
+            # quad is the frame printed just inside the card edge
+            return None if fills_image(corners, width, height) else corners
+    return None
+
+
+def fills_image(corners, width, height):
+    # Every corner near the matching corner of the photo
+    photo = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+    return bool((np.abs(corners - photo) <= EDGE_MARGIN * np.array([width, height])).all())
+
+
+def warp_card(image, corners, size=CARD_SIZE):
+    """Perspective-warps the quad at `corners` onto an upright card of `size`."""
+    width, height = size
+    target = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(corners, target)
+    return cv2.warpPerspective(image, matrix, (width, height), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
+def align_card(image, gray=None):
+    """
+    Returns (card, found): `image` warped to the canonical card frame.
+
+    When no card outline is found the photo is assumed to be a tightly
+    cropped scan already and is simply resized to the frame.
+    """
+    if gray is None:
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    corners = detect_card(gray)
+    if corners is None:
+        return cv2.resize(image, CARD_SIZE, interpolation=cv2.INTER_AREA), False
+    return warp_card(image, corners), True
+
+
+def align_display_image(img):
+    """Aligned RGB copy of a PIL image, for drawing templates on."""
+    return Image.fromarray(align_card(np.asarray(img.convert("RGB")))[0])
+
+
+def to_card_fractions(coords, size=CARD_SIZE):
+    width, height = size
+    x1, y1, x2, y2 = coords
+    return [round(x1 / width, 5), round(y1 / height, 5), round(x2 / width, 5), round(y2 / height, 5)]
+
+
+def from_card_fractions(fractions, size=CARD_SIZE):
+    width, height = size
+    x1, y1, x2, y2 = fractions
+    return (round(x1 * width), round(y1 * height), round(x2 * width), round(y2 * height))
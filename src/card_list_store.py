@@ -0,0 +1,164 @@
+# card_list_store.py
+"""
+Compiled card lists for fast startup.
+
+Each card_db/*.txt can be compiled into a .cdb file next to it holding the
+names as one UTF-8 blob plus an offsets array, and optionally the
+FuzzyIndex postings. The file is memory-mapped when loaded, so opening it
+costs no parsing, and processes that read the same list share its pages.
+
+Rebuild after editing a list:
+
+    python src/card_list_store.py
+"""
+import json
+import struct
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+
+from fuzzy_index import FuzzyIndex
+
+MAGIC = b"CARDDB01"
+COMPILED_SUFFIX = ".cdb"
+ALIGN = 16
+INDEX_ARRAYS = ["lengths", "keys", "indptr", "ids", "counts"]
+
+
+class MappedCardList(Sequence):
+    """
+    Read-only list of card names backed by a memory-mapped blob.
+
+    Names are decoded on access. Iterating decodes the whole blob once,
+    which is what rapidfuzz does when handed the full list.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("card list index out of range")
+        # Each name is stored with a trailing newline separator
+        return self.blob[self.offsets[i]:self.offsets[i + 1] - 1].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def tolist(self):
+        return self.blob.tobytes().decode("utf-8").split("\n")[:-1]
+
+
+def read_card_names(txt_path: Path) -> list[str]:
+    with open(txt_path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def compiled_path(txt_path: Path) -> Path:
+    return txt_path.with_suffix(COMPILED_SUFFIX)
+
+
+def compile_card_list(txt_path: Path, out_path: Path = None, with_index: bool = True) -> Path:
+    out_path = out_path or compiled_path(txt_path)
+    names = read_card_names(txt_path)
+
+    encoded = [name.encode("utf-8") + b"\n" for name in names]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    arrays = {
+        "offsets": offsets,
+        "blob": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+    }
+    if with_index:
+        index = FuzzyIndex.build(names)
+        arrays.update({name: getattr(index, name) for name in INDEX_ARRAYS})
+
+    source = txt_path.stat()
+    header = {
+        "count": len(names),
+        "source_size": source.st_size,
+        "source_mtime_ns": source.st_mtime_ns,
+        "arrays": {},
+    }
+
+    # Array offsets depend on the header length, so lay out relative to the
+    # data section and pad the header to a fixed alignment.
+    position = 0
+    for name, array in arrays.items():
+        header["arrays"][name] = [position, array.dtype.str, len(array)]
+        position += -(-array.nbytes // ALIGN) * ALIGN
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * (-(len(MAGIC) + 4 + len(header_bytes)) % ALIGN)
+
+    tmp_path = out_path.with_suffix(out_path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for array in arrays.values():
+            data = np.ascontiguousarray(array).tobytes()
+            f.write(data)
+            f.write(b"\0" * (-len(data) % ALIGN))
+    tmp_path.replace(out_path)
+    return out_path
+
+
+def load_compiled_card_list(txt_path: Path):
+    """
+    Returns (MappedCardList, FuzzyIndex or None), or None when there is no
+    compiled file or it is older than the text list it was built from.
+    """
+    path = compiled_path(txt_path)
+    if not path.exists():
+        return None
+
+    try:
+        buf = np.memmap(path, dtype=np.uint8, mode="r")
+        if buf[:len(MAGIC)].tobytes() != MAGIC:
+            return None
+        header_len = struct.unpack("<I", buf[len(MAGIC):len(MAGIC) + 4].tobytes())[0]
+        data_start = len(MAGIC) + 4 + header_len
+        header = json.loads(buf[len(MAGIC) + 4:data_start].tobytes())
+    except (OSError, ValueError) as e:
+        print(f"Warning: ignoring unreadable compiled card list {path}: {e}")
+        return None
+
+    if txt_path.exists():
+        source = txt_path.stat()
+        if (source.st_size, source.st_mtime_ns) != (header["source_size"], header["source_mtime_ns"]):
+            return None
+
+    arrays = {}
+    for name, (offset, dtype, length) in header["arrays"].items():
+        dtype = np.dtype(dtype)
+        start = data_start + offset
+        arrays[name] = buf[start:start + length * dtype.itemsize].view(dtype)
+
+    names = MappedCardList(arrays["offsets"], arrays["blob"])
+    index = None
+    if all(name in arrays for name in INDEX_ARRAYS):
+        index = FuzzyIndex(names, *(arrays[name] for name in INDEX_ARRAYS))
+    return names, index
+
+
+def main(paths):
+    from fuzzy_utils import CARD_DB_DIR
+
+    txt_paths = [Path(p) for p in paths] or sorted(CARD_DB_DIR.glob("*.txt"))
+    for txt_path in txt_paths:
+        out_path = compile_card_list(txt_path)
+        print(f"{txt_path.name} -> {out_path.name} ({out_path.stat().st_size / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,190 @@
+# cli.py
+"""
+Headless entry point for running scans and price lookups without the GUI
+(e.g. from cron on a server). Never imports tkinter.
+
+    python src/cli.py scan --input IN --output OUT --template capture_template.json
+    python src/cli.py price --csv report.csv --column "Fuzzy Name"
+
+Progress goes to stderr; a JSON summary of the run is printed to stdout.
+The first Ctrl+C stops taking new work and lets the run finish cleanly
+(the summary says "cancelled" and a rerun resumes); a second one aborts.
+The template file is written by the GUI to the output folder on every scan.
+"""
+import argparse
+import json
+import multiprocessing
+import signal
+import sys
+from contextlib import contextmanager, redirect_stdout
+from pathlib import Path
+
+from config_utils import load_config
+from job_control import JobController
+from ebay_provider import EbayMedianProvider, EbayLastSoldProvider, EbayTrimmedMeanProvider
+from ocr_cache import open_ocr_cache, DEFAULT_MAX_ENTRIES as DEFAULT_OCR_CACHE_ENTRIES
+from price_aggregator import PriceAggregator, DEFAULT_TIMEOUT_SECONDS
+from price_cache import CachedPriceProvider, open_price_cache, DEFAULT_TTL_HOURS, DEFAULT_MAX_ENTRIES
+from price_lookup import update_csv_with_prices, DEFAULT_WORKERS, DEFAULT_RATE_LIMIT
+from output_writer import OUTPUT_MODES
+from phash_index import DUPLICATE_MODES, DEFAULT_MAX_DISTANCE
+from preprocess import parse_steps, DEFAULT_PRESET
+from region_template import load_template, load_region_preprocess, load_template_frame, FRAME_CARD
+from scan_pipeline import find_images, run_scan
+
+PROVIDERS = {
+    "median": EbayMedianProvider,
+    "last-sold": EbayLastSoldProvider,
+    "trimmed-mean": EbayTrimmedMeanProvider,
+}
+# Every provider above, one price column each
+ALL_PROVIDERS = "all"
+
+
+def create_provider(name, config, use_cache=True, timeout=None):
+    cache = None
+    ttl_hours = config.get("price_cache_ttl_hours", DEFAULT_TTL_HOURS)
+    if use_cache and ttl_hours > 0:
+        cache = open_price_cache(ttl_hours, config.get("price_cache_max_entries", DEFAULT_MAX_ENTRIES))
+    if name == ALL_PROVIDERS:
+        return PriceAggregator([cls() for cls in PROVIDERS.values()], cache=cache,
+                               timeout=timeout or config.get("price_timeout_seconds", DEFAULT_TIMEOUT_SECONDS))
+    provider = PROVIDERS[name]()
+    return CachedPriceProvider(provider, cache) if cache is not None else provider
+
+
+@contextmanager
+def cancel_on_interrupt(job):
+    """The first SIGINT cancels `job`; the next one raises KeyboardInterrupt as usual."""
+    def handler(signum, frame):
+        print("Interrupted: finishing work in progress (Ctrl+C again to abort)", file=sys.stderr, flush=True)
+        job.cancel()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    previous = signal.signal(signal.SIGINT, handler)
+    try:
+        yield job
+    finally:
+        signal.signal(signal.SIGINT, previous)
+
+
+def run_prices(args, config, csv_path):
+    provider = create_provider(args.provider, config, use_cache=not args.no_cache, timeout=args.price_timeout)
+    summary = {"provider": provider.name(), "column": args.column}
+    with cancel_on_interrupt(JobController("cards")) as job:
+        output_path = update_csv_with_prices(
+            Path(csv_path), provider, args.column,
+            workers=args.price_workers or config.get("price_workers", DEFAULT_WORKERS),
+            rate_limit=args.rate_limit or config.get("price_rate_limit", DEFAULT_RATE_LIMIT),
+            summary=summary, job=job, profile=args.profile or config.get("profile", False),
+        )
+    if Path(output_path) == Path(csv_path):
+        raise ValueError(f"Column {args.column!r} not found in {csv_path}")
+    summary["output_path"] = str(output_path)
+    return summary
+
+
+def command_scan(args, config):
+    in_dir, out_dir = Path(args.input), Path(args.output)
+    if not in_dir.is_dir():
+        raise ValueError(f"Input folder not found: {in_dir}")
+
+    capture_data = load_template(Path(args.template))
+    # Steps saved with a region in the template win over the config file
+    region_preprocess = dict(config.get("region_preprocess", {}), **load_region_preprocess(Path(args.template)))
+    images = find_images(in_dir)
+    if not images:
+        raise ValueError(f"No images found in {in_dir}")
+
+    job = JobController("images")
+
+    def report_progress(done, total, img_path):
+        print(f"[{job.status_line()}] {img_path.name}", file=sys.stderr, flush=True)
+
+    with cancel_on_interrupt(job):
+        scan = run_scan(
+            images, out_dir, capture_data,
+            workers=args.workers or config.get("ocr_workers"),
+            backend=args.backend or config.get("ocr_backend", "auto"),
+            fuzzy_mode=args.fuzzy_mode or config.get("fuzzy_mode", "indexed"),
+            progress=report_progress,
+            resume=not args.no_resume,
+            preprocess=parse_steps(args.preprocess) if args.preprocess else config.get("ocr_preprocess", DEFAULT_PRESET),
+            region_preprocess=region_preprocess,
+            align=load_template_frame(Path(args.template)) == FRAME_CARD,
+            duplicates=args.duplicates or config.get("duplicates", "off"),
+            duplicate_distance=config.get("duplicate_distance", DEFAULT_MAX_DISTANCE),
+            output_mode=args.output_mode or config.get("output_mode", "copy"),
+            ocr_cache=None if args.no_ocr_cache else open_ocr_cache(config.get("ocr_cache_max_entries", DEFAULT_OCR_CACHE_ENTRIES)),
+            job=job, profile=args.profile or config.get("profile", False),
+        )
+    summary = {"scan": scan}
+    if args.column and not scan["cancelled"]:
+        summary["prices"] = run_prices(args, config, summary["scan"]["csv_path"])
+    return summary
+
+
+def command_price(args, config):
+    return {"prices": run_prices(args, config, args.csv)}
+
+
+def add_price_options(parser, column_required):
+    parser.add_argument("--column", required=column_required,
+                        help="CSV column to search prices for" + ("" if column_required else " (enables pricing after the scan)"))
+    parser.add_argument("--provider", choices=sorted(PROVIDERS) + [ALL_PROVIDERS], default="median",
+                        help=f"pricing strategy; {ALL_PROVIDERS!r} writes one column per strategy from a single search")
+    parser.add_argument("--price-timeout", type=float, help="seconds to wait for each price source per card (with --provider all)")
+    parser.add_argument("--price-workers", type=int, help="concurrent price lookups")
+    parser.add_argument("--rate-limit", type=float, help="maximum price requests per second")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the persistent price cache")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Trading card scanner (headless)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan = commands.add_parser("scan", help="OCR a folder of card images")
+    scan.add_argument("--input", required=True, help="folder of .jpg/.png card images")
+    scan.add_argument("--output", required=True, help="output folder for images/, the CSV and the log")
+    scan.add_argument("--template", required=True, help="capture region template (capture_template.json)")
+    scan.add_argument("--workers", type=int, help="OCR worker processes")
+    scan.add_argument("--backend", choices=["auto", "tesserocr", "pytesseract"])
+    scan.add_argument("--fuzzy-mode", choices=["indexed", "batch"])
+    scan.add_argument("--preprocess", help="preprocessing preset (none, standard, full, legacy) or comma-separated steps for every region")
+    scan.add_argument("--duplicates", choices=DUPLICATE_MODES, help="flag or skip near-duplicate photos before OCR")
+    scan.add_argument("--output-mode", choices=OUTPUT_MODES, help="copy, hard-link or move images into OUT_DIR/images")
+    scan.add_argument("--no-resume", action="store_true", help="rescan images already recorded in the output folder")
+    scan.add_argument("--no-ocr-cache", action="store_true", help="bypass the persistent OCR result cache")
+    scan.add_argument("--profile", action="store_true", help="run under cProfile and save the profile next to the CSV")
+    add_price_options(scan, column_required=False)
+    scan.set_defaults(handler=command_scan)
+
+    price = commands.add_parser("price", help="append prices to a scan CSV")
+    price.add_argument("--csv", required=True)
+    price.add_argument("--profile", action="store_true", help="run under cProfile and save the profile next to the CSV")
+    add_price_options(price, column_required=True)
+    price.set_defaults(handler=command_price)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    config = load_config()
+
+    try:
+        # Keep stdout for the machine-readable summary
+        with redirect_stdout(sys.stderr):
+            summary = args.handler(args, config)
+    except (OSError, ValueError) as e:
+        print(json.dumps({"status": "error", "error": str(e)}))
+        return 1
+
+    cancelled = any(part.get("cancelled") for part in summary.values())
+    print(json.dumps({"status": "cancelled" if cancelled else "ok", **summary}, indent=2))
+    return 130 if cancelled else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
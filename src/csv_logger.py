@@ -3,6 +3,62 @@ import csv
 from datetime import datetime
 from pathlib import Path
 
+from region_template import NO_FUZZY
+
+FIXED_KEYS = {"input_path", "output_path"}
+
+
+def summary_columns(capture_data):
+    """
+    Returns the dynamic CSV columns for a scan, known before it starts:
+    one per capture box plus a "Fuzzy <name>" column for fuzzy-matched boxes.
+    """
+    keys = set()
+    for name, _, fuzzy in capture_data:
+        keys.add(name)
+        if fuzzy != NO_FUZZY:
+            keys.add(f"Fuzzy {name}")
+    return sorted(keys - FIXED_KEYS)
+
+
+class CardSummaryWriter:
+    """
+    Writes the scan summary CSV one row at a time.
+
+    Each row is flushed as it is written, so the report is readable while
+    a scan is still running and survives a crash part-way through.
+    """
+
+    def __init__(self, output_dir: Path, dynamic_keys):
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        self.path = output_dir / f"Scanning-Report-{timestamp}.csv"
+        self.dynamic_keys = list(dynamic_keys)
+        self.rows = 0
+
+        self._file = open(self.path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(["Input File Path", "Output File Path"] + self.dynamic_keys)
+        self._file.flush()
+
+    def write(self, entry):
+        row = [
+            entry.get("input_path", ""),
+            entry.get("output_path", "")
+        ] + [entry.get(k, "") for k in self.dynamic_keys]
+        self._writer.writerow(row)
+        self._file.flush()
+        self.rows += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
 def save_card_summary_to_csv(output_dir: Path, card_entries):
     """
     Saves card scanning results to a CSV file.
@@ -19,28 +75,14 @@ def save_card_summary_to_csv(output_dir: Path, card_entries):
     Returns:
         str: The name of the saved CSV file.
     """
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    csv_path = output_dir / f"Scanning-Report-{timestamp}.csv"
-
     # Determine dynamic attribute keys from bounding boxes
     if not card_entries:
         return None
 
-    fixed_keys = {"input_path", "output_path"}
-    dynamic_keys = sorted(set().union(*(entry.keys() for entry in card_entries)) - fixed_keys)
-
-    with open(csv_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-
-        # Write header
-        header = ["Input File Path", "Output File Path"] + dynamic_keys
-        writer.writerow(header)
+    dynamic_keys = sorted(set().union(*(entry.keys() for entry in card_entries)) - FIXED_KEYS)
 
+    with CardSummaryWriter(output_dir, dynamic_keys) as writer:
         for entry in card_entries:
-            row = [
-                entry.get("input_path", ""),
-                entry.get("output_path", "")
-            ] + [entry.get(k, "") for k in dynamic_keys]
-            writer.writerow(row)
+            writer.write(entry)
 
-    return csv_path.name
+    return writer.path.name
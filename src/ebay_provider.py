@@ -1,86 +1,217 @@
 # ebay_provider.py
 import requests
 import re
+import threading
 from bs4 import BeautifulSoup
 from statistics import median, StatisticsError, mean
-from price_providers import PriceProvider
+from price_providers import ListingPriceProvider
+from http_utils import create_session
+from stage_stats import StageStats
+
+try:
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+EBAY_SEARCH_URL = "https://www.ebay.com/sch/i.html"
+PRICE_PATTERN = re.compile(r"\$([\d,.]+)")
+# Characters of HTML fed to the pull parser at a time
+PARSE_CHUNK = 32 * 1024
+# Sold listings collected per search, shared by every pricing strategy
+LISTINGS_PER_LOOKUP = 10
+# Fraction of the cheapest and of the dearest sales the trimmed mean ignores
+TRIM_FRACTION = 0.2
 
 COMMON_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
 }
 
-def fetch_ebay_prices(card_name, max_items=10):
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    # One pooled session shared by every lookup so connections are reused
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session(headers=COMMON_HEADERS)
+        return _session
+
+def fetch_ebay_prices(card_name, max_items=10, session=None, search_url=EBAY_SEARCH_URL, stats=None):
+    stats = stats or StageStats()
     query = requests.utils.quote(card_name + " trading card")
-    url = f"https://www.ebay.com/sch/i.html?_nkw={query}&_sacat=0&LH_Sold=1&LH_Complete=1"
+    url = f"{search_url}?_nkw={query}&_sacat=0&LH_Sold=1&LH_Complete=1"
     print(f"Fetching eBay prices for: {card_name}")
     print(f"Search URL: {url}")
 
-    prices = []
-
     try:
-        response = requests.get(url, headers=COMMON_HEADERS, timeout=10)
-        response.raise_for_status()
+        with stats.timer("http"):
+            response = (session or get_session()).get(url, timeout=10)
+            response.raise_for_status()
     except requests.RequestException as e:
+        stats.count("http errors")
         print(f"Error fetching eBay results: {e}")
         return []
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    with stats.timer("parse"):
+        prices = parse_ebay_prices(response.text, max_items)
+    print(f"Collected prices: {prices}")
+    return prices
+
+
+def parse_ebay_prices(html, max_items=10):
+    """Sold prices from an eBay search results page, skipping ads, lots and discounted listings."""
+    if HAS_LXML:
+        return parse_ebay_prices_lxml(html, max_items)
+    return parse_ebay_prices_soup(html, max_items)
+
+
+def accept_listing(title, price_text, discounted):
+    # Shared filter for both parsers; returns the sold price or None
+    if title is None or price_text is None or discounted:
+        return None
+    title = title.lower()
+    if "lot" in title or "bundle" in title or "x" in title:
+        return None
+    match = PRICE_PATTERN.search(price_text)
+    if not match:
+        return None
+    try:
+        price = float(match.group(1).replace(",", ""))
+    except ValueError:
+        return None
+    return price if price > 0 else None
+
+
+def parse_ebay_prices_lxml(html, max_items=10):
+    """
+    Single pass over the page with libxml2's pull parser.
+
+    The page is fed in chunks and each listing is read as soon as its
+    closing tag arrives: sponsored items (an "AdChoice" anywhere in the
+    item's text) are dropped, then one walk over its elements picks up the
+    title, price and strikethrough. Parsing stops once `max_items`
+    prices are collected, so the rest of the page is never parsed.
+    """
+    prices = []
+    parser = etree.HTMLPullParser(events=("end",))
+    for start in range(0, len(html), PARSE_CHUNK):
+        parser.feed(html[start:start + PARSE_CHUNK])
+        for _, element in parser.read_events():
+            classes = element.get("class")
+            if not classes or "s-item" not in classes.split():
+                continue
+            # Same test as the soup parser: the marker may be split across
+            # elements or follow one of eBay's <!--F#...--> comments
+            if "AdChoice" in "".join(element.itertext()):
+                element.clear()
+                continue
+            title = price_text = None
+            discounted = False
+            for node in element.iter(etree.Element):
+                classes = node.get("class")
+                if not classes:
+                    continue
+                classes = classes.split()
+                if title is None and "s-item__title" in classes:
+                    title = "".join(node.itertext())
+                elif price_text is None and "s-item__price" in classes:
+                    price_text = "".join(node.itertext())
+                if "STRIKETHROUGH" in classes:
+                    discounted = True
+            element.clear()
+            price = accept_listing(title, price_text, discounted)
+            if price is not None:
+                prices.append(price)
+                if len(prices) >= max_items:
+                    return prices
+    return prices
+
+
+def parse_ebay_prices_soup(html, max_items=10):
+    """BeautifulSoup fallback for when lxml is not installed."""
+    prices = []
+    soup = BeautifulSoup(html, "html.parser")
 
     for item in soup.select(".s-item"):
         if "AdChoice" in item.get_text():
             continue
 
         title_tag = item.select_one(".s-item__title")
-        if not title_tag:
-            continue
-        title = title_tag.get_text().lower()
-        if "lot" in title or "bundle" in title or "x" in title:
-            continue
-
         price_tag = item.select_one(".s-item__price")
-        if not price_tag:
-            continue
+        price = accept_listing(
+            title_tag.get_text() if title_tag else None,
+            price_tag.get_text() if price_tag else None,
+            item.select_one(".STRIKETHROUGH") is not None,
+        )
+        if price is not None:
+            prices.append(price)
+            if len(prices) >= max_items:
+                break
 
-        if item.select_one(".STRIKETHROUGH"):
-            continue  # skip discounted pricing blocks
+    return prices
 
-        match = re.search(r"\$([\d,.]+)", price_tag.get_text())
-        if match:
-            try:
-                price = float(match.group(1).replace(",", ""))
-                if price > 0:
-                    prices.append(price)
-            except ValueError:
-                continue
 
-        if len(prices) >= max_items:
-            break
+def median_price(prices):
+    try:
+        return round(median(prices), 2)
+    except StatisticsError:
+        return None
+
+
+def last_sold_price(prices):
+    if not prices:
+        return None
+
+    avg = mean(prices)
+    filtered = [p for p in prices if p < avg * 1.5]
+    return round(filtered[0], 2) if filtered else round(prices[0], 2)
 
-    print(f"Collected prices: {prices}")
-    return prices
 
+def trimmed_mean_price(prices, trim=TRIM_FRACTION):
+    # Drops the cheapest and dearest `trim` of the sales before averaging
+    if not prices:
+        return None
+    ordered = sorted(prices)
+    cut = int(len(ordered) * trim)
+    return round(mean(ordered[cut:len(ordered) - cut] or ordered), 2)
 
-class EbayMedianProvider(PriceProvider):
+
+class EbaySoldProvider(ListingPriceProvider):
+    """One scrape of recent sold listings, reduced to a price by `price_from_listings`."""
+
+    def __init__(self, search_url=EBAY_SEARCH_URL):
+        # Overridable so benchmarks can point lookups at a local stand-in
+        self.search_url = search_url
+
+    def listing_source(self):
+        return ("ebay sold", self.search_url, LISTINGS_PER_LOOKUP)
+
+    def fetch_listings(self, card_name):
+        self.throttle()
+        return fetch_ebay_prices(card_name, max_items=LISTINGS_PER_LOOKUP, search_url=self.search_url, stats=self.stats)
+
+
+class EbayMedianProvider(EbaySoldProvider):
     def name(self):
         return "eBay (Median Price)"
 
-    def fetch_price(self, card_name: str) -> float:
-        prices = fetch_ebay_prices(card_name)
-        try:
-            return round(median(prices), 2)
-        except StatisticsError:
-            return None
+    def price_from_listings(self, prices):
+        return median_price(prices)
 
 
-class EbayLastSoldProvider(PriceProvider):
+class EbayLastSoldProvider(EbaySoldProvider):
     def name(self):
         return "eBay (Last Sold Price)"
 
-    def fetch_price(self, card_name: str) -> float:
-        prices = fetch_ebay_prices(card_name, max_items=10)
-        if not prices:
-            return None
+    def price_from_listings(self, prices):
+        return last_sold_price(prices)
+
+
+class EbayTrimmedMeanProvider(EbaySoldProvider):
+    def name(self):
+        return "eBay (Trimmed Mean Price)"
 
-        avg = mean(prices)
-        filtered = [p for p in prices if p < avg * 1.5]
-        return round(filtered[0], 2) if filtered else round(prices[0], 2)
+    def price_from_listings(self, prices):
+        return trimmed_mean_price(prices)
@@ -0,0 +1,150 @@
+# fuzzy_index.py
+import numpy as np
+from rapidfuzz import fuzz, process
+
+# Number of top-ranked candidates scored first to raise the cutoff before
+# the exact pass. Only affects speed, never the result.
+PROBE_SIZE = 32
+
+# Below this many names a plain rapidfuzz scan is faster than the index.
+MIN_INDEXED_SIZE = 2000
+
+# Slack added to bounds so float rounding can never prune a candidate that
+# rapidfuzz would score at or above the cutoff.
+BOUND_EPSILON = 1e-6
+
+# rapidfuzz converts float cutoffs to distances with some rounding error, so
+# the cutoff it gets is loosened and the exact comparison is done here.
+# Letting extra candidates through cannot change which one scores best.
+CUTOFF_SLACK = 0.01
+
+
+def bigram_counts(text):
+    """Returns {bigram key: occurrences} for a string, keys packed as int64."""
+    counts = {}
+    for a, b in zip(text, text[1:]):
+        key = (ord(a) << 21) | ord(b)
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+class FuzzyIndex:
+    """
+    Bigram inverted index over a card name list for `fuzz.ratio` lookups.
+
+    fuzz.ratio is 200 * LCS / (len(a) + len(b)). If two strings share an
+    LCS of length L, at least 3L - len(a) - len(b) - 1 of their bigrams
+    must match (each unmatched character breaks at most two of them). So
+    the number of shared bigrams G bounds L <= (G + len(a) + len(b) + 1) / 3,
+    which gives an upper bound on the score of every candidate. Candidates
+    whose bound is below the cutoff are skipped, and the rest are scored with
+    rapidfuzz in list order. The result is therefore identical to
+    `process.extractOne` over the whole list, including tie-breaking.
+
+    Postings are stored as flat NumPy arrays (CSR layout) so they can be
+    saved to disk and memory-mapped.
+    """
+
+    def __init__(self, names, lengths, keys, indptr, ids, counts):
+        self.names = names
+        self.lengths = lengths
+        self.keys = keys
+        self.indptr = indptr
+        self.ids = ids
+        self.counts = counts
+        self._name_list = None
+
+    def name_list(self):
+        """The names as a plain list, decoded once (memory-mapped lists decode on access)."""
+        if self._name_list is None:
+            self._name_list = list(self.names)
+        return self._name_list
+
+    @classmethod
+    def build(cls, names):
+        lengths = np.fromiter((len(n) for n in names), dtype=np.int32, count=len(names))
+
+        postings = {}
+        for idx, name in enumerate(names):
+            for key, count in bigram_counts(name).items():
+                postings.setdefault(key, []).append((idx, count))
+
+        keys = np.array(sorted(postings), dtype=np.int64)
+        sizes = np.array([len(postings[k]) for k in keys.tolist()], dtype=np.int64)
+        indptr = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=indptr[1:])
+
+        ids = np.empty(indptr[-1], dtype=np.int32)
+        counts = np.empty(indptr[-1], dtype=np.uint16)
+        for i, key in enumerate(keys.tolist()):
+            entries = postings[key]
+            ids[indptr[i]:indptr[i + 1]] = [e[0] for e in entries]
+            counts[indptr[i]:indptr[i + 1]] = [min(e[1], 0xFFFF) for e in entries]
+
+        return cls(names, lengths, keys, indptr, ids, counts)
+
+    def shared_bigrams(self, query):
+        """Returns the multiset bigram overlap between `query` and every name."""
+        query_grams = bigram_counts(query)
+        keys = np.fromiter(query_grams, dtype=np.int64, count=len(query_grams))
+        query_counts = np.fromiter(query_grams.values(), dtype=np.int32, count=len(query_grams))
+
+        pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        found = self.keys[pos] == keys
+        pos, query_counts = pos[found], query_counts[found]
+        if not len(pos):
+            return np.zeros(len(self.lengths), dtype=np.int32)
+
+        ids = np.concatenate([self.ids[self.indptr[p]:self.indptr[p + 1]] for p in pos])
+        if query_counts.max() == 1:
+            # Common case: every query bigram is unique, so each posting adds one
+            return np.bincount(ids, minlength=len(self.lengths))
+
+        counts = np.concatenate([
+            np.minimum(self.counts[self.indptr[p]:self.indptr[p + 1]], qc)
+            for p, qc in zip(pos, query_counts)
+        ])
+        return np.bincount(ids, weights=counts, minlength=len(self.lengths)).astype(np.int32)
+
+    def score_bounds(self, query):
+        """Returns an upper bound of fuzz.ratio(query, name) for every name."""
+        query_len = len(query)
+        total = self.lengths + query_len  # query has >= 2 chars, so never zero
+        lcs = (self.shared_bigrams(query) + total + 1) // 3
+        np.minimum(lcs, self.lengths, out=lcs)
+        np.minimum(lcs, query_len, out=lcs)
+        return 200.0 * lcs / total
+
+    def extract_one(self, query, score_cutoff=0):
+        """
+        Same contract as `process.extractOne(query, names, scorer=fuzz.ratio,
+        score_cutoff=...)`: returns (match, score, index) or None.
+        """
+        if len(query) < 2 or len(self.names) < MIN_INDEXED_SIZE:
+            return self._extract(query, self.names, score_cutoff)
+
+        bounds = self.score_bounds(query)
+        candidates = np.flatnonzero(bounds >= score_cutoff - BOUND_EPSILON)
+        if not len(candidates):
+            return None
+
+        # Score the most promising names first to tighten the cutoff
+        if len(candidates) > PROBE_SIZE:
+            top = np.argpartition(-bounds[candidates], PROBE_SIZE)[:PROBE_SIZE]
+            probe = self._extract(query, self._shortlist(np.sort(candidates[top])), score_cutoff)
+            if probe:
+                score_cutoff = probe[1]
+                candidates = candidates[bounds[candidates] >= score_cutoff - BOUND_EPSILON]
+
+        return self._extract(query, self._shortlist(candidates), score_cutoff)
+
+    def _shortlist(self, candidates):
+        return {i: self.names[i] for i in candidates.tolist()}
+
+    def _extract(self, query, choices, score_cutoff):
+        result = process.extractOne(
+            query, choices, scorer=fuzz.ratio, score_cutoff=max(0, score_cutoff - CUTOFF_SLACK)
+        )
+        if result is None or result[1] < score_cutoff:
+            return None
+        return result
@@ -1,10 +1,23 @@
 # fuzzy_utils.py
+from collections import namedtuple
+from collections.abc import Sequence
+from functools import lru_cache
+import numpy as np
 from rapidfuzz import fuzz, process
 from pathlib import Path
 
+from card_list_store import load_compiled_card_list, read_card_names
+from fuzzy_index import FuzzyIndex
+
 CARD_DB_DIR = Path(__file__).parent / "card_db"
 
-def load_card_list(tcgtag: str) -> list[str]:
+# Queries scored per cdist call; bounds the score matrix to rows x len(card_list) float32
+BATCH_CHUNK_ROWS = 256
+
+FuzzyMatch = namedtuple("FuzzyMatch", ["match", "score", "runner_up", "runner_up_score"])
+NO_MATCH = FuzzyMatch("", 0.0, "", 0.0)
+
+def card_list_path(tcgtag: str) -> Path:
     file_map = {
         "Pokemon Name": "pokemon_name.txt",
         "YuGiOh Card Name": "yugioh_card_names.txt",
@@ -13,17 +26,77 @@ def load_card_list(tcgtag: str) -> list[str]:
     filename = file_map.get(tcgtag)
     if not filename:
         raise ValueError(f"Unknown TCG: {tcgtag}")
-    
-    path = CARD_DB_DIR / filename
+    return CARD_DB_DIR / filename
+
+@lru_cache(maxsize=None)
+def load_compiled(tcgtag: str):
+    # Memory-mapped (names, index) if the list was compiled, else None
+    return load_compiled_card_list(card_list_path(tcgtag))
+
+def load_card_list(tcgtag: str) -> Sequence[str]:
+    compiled = load_compiled(tcgtag)
+    if compiled:
+        return compiled[0]
+
+    path = card_list_path(tcgtag)
     if not path.exists():
         raise FileNotFoundError(f"Missing card list: {path}")
-    
-    with open(path, encoding="utf-8") as f:
-        return [line.strip() for line in f if line.strip()]
 
-def fuzzy_match_name(name: str, card_list: list[str], threshold: int = 70) -> str:
+    return read_card_names(path)
+
+@lru_cache(maxsize=None)
+def load_card_index(tcgtag: str) -> FuzzyIndex:
+    compiled = load_compiled(tcgtag)
+    if compiled and compiled[1]:
+        return compiled[1]
+    return FuzzyIndex.build(load_card_list(tcgtag))
+
+def fuzzy_match_name(name: str, card_list: list[str], threshold: int = 70, index: FuzzyIndex = None) -> str:
     if not name or not card_list:
         return ""
-    
+
+    if index is not None:
+        result = index.extract_one(name, score_cutoff=threshold)
+        return result[0] if result else ""
+
     match, score, _ = process.extractOne(name, card_list, scorer=fuzz.ratio)
     return match if score >= threshold else ""
+
+def batch_fuzzy_match(names: list[str], card_list: list[str], threshold: int = 70, workers: int = -1) -> list[FuzzyMatch]:
+    """
+    Matches a whole batch of OCR strings against a card list in one go.
+
+    Scores are computed with `process.cdist` across all cores into a NumPy
+    matrix, chunked to keep memory bounded. `match` follows the same rules
+    as `fuzzy_match_name` (first best candidate, "" below the threshold);
+    `score`, `runner_up` and `runner_up_score` are always filled in.
+    A plain list is used as is; pass one (e.g. `FuzzyIndex.name_list()`)
+    when calling this repeatedly, so the choices are not rebuilt each time.
+    """
+    results = [NO_MATCH] * len(names)
+    queries = [(i, name) for i, name in enumerate(names) if name]
+    if not queries or not card_list:
+        return results
+
+    choices = card_list if isinstance(card_list, list) else list(card_list)
+    for start in range(0, len(queries), BATCH_CHUNK_ROWS):
+        chunk = queries[start:start + BATCH_CHUNK_ROWS]
+        scores = process.cdist(
+            [name for _, name in chunk], choices, scorer=fuzz.ratio, dtype=np.float32, workers=workers
+        )
+        rows = np.arange(len(chunk))
+        best = scores.argmax(axis=1)  # argmax returns the first maximum, like extractOne
+        scores[rows, best] = -1
+        second = scores.argmax(axis=1)
+
+        for row, (i, name) in enumerate(chunk):
+            match = choices[best[row]]
+            # Re-score in float64 so the threshold test matches fuzzy_match_name exactly
+            score = fuzz.ratio(name, match)
+            runner_up, runner_up_score = "", 0.0
+            if len(choices) > 1:
+                runner_up = choices[second[row]]
+                runner_up_score = fuzz.ratio(name, runner_up)
+            results[i] = FuzzyMatch(match if score >= threshold else "", score, runner_up, runner_up_score)
+
+    return results
@@ -0,0 +1,113 @@
+# gui_log.py
+import io
+import threading
+from collections import deque
+from queue import SimpleQueue, Empty
+
+# Lines of scrollback kept in the output pane
+MAX_LINES = 5000
+FLUSH_INTERVAL_MS = 100
+
+
+class GuiLog(io.TextIOBase):
+    """
+    File-like stdout/stderr replacement that feeds a Tk Text widget.
+
+    `write` may be called from any thread: it only puts the text on a
+    queue (and mirrors it to a file, if one is set). The Tk main loop
+    drains the queue every `flush_ms` and inserts everything that arrived
+    in one widget update. Scrollback is a ring buffer of `max_lines`
+    lines; older lines are dropped from the widget as new ones come in,
+    and a burst longer than the buffer is never inserted in full.
+    """
+
+    def __init__(self, root, text_widget, max_lines=MAX_LINES, flush_ms=FLUSH_INTERVAL_MS):
+        self.root = root
+        self.text = text_widget
+        self.max_lines = max(1, max_lines)
+        self.flush_ms = flush_ms
+        self.lines = deque(maxlen=self.max_lines)
+        self._partial = ""  # text after the last newline
+        self._shown_lines = 0  # complete lines in the widget
+        self._queue = SimpleQueue()
+        self._mirror = None
+        self._mirror_lock = threading.Lock()
+        self.root.after(self.flush_ms, self._drain)
+
+    def writable(self):
+        return True
+
+    def write(self, msg):
+        if msg:
+            self._queue.put(msg)
+            with self._mirror_lock:
+                if self._mirror is not None:
+                    self._mirror.write(msg)
+        return len(msg)
+
+    def mirror_to(self, file):
+        """Also copies everything written from now on to `file` (None to stop). The caller closes it."""
+        with self._mirror_lock:
+            if self._mirror is not None:
+                self._mirror.flush()
+            self._mirror = file
+
+    def flush(self):
+        with self._mirror_lock:
+            if self._mirror is not None:
+                self._mirror.flush()
+
+    def clear(self):
+        """Empties the pane. Call from the Tk thread."""
+        self._take()
+        self.lines.clear()
+        self._partial = ""
+        self._render()
+
+    def _take(self):
+        chunks = []
+        while True:
+            try:
+                chunks.append(self._queue.get_nowait())
+            except Empty:
+                return "".join(chunks)
+
+    def _drain(self):
+        try:
+            pending = self._take()
+            if pending:
+                *complete, self._partial = (self._partial + pending).split("\n")
+                self.lines.extend(complete)
+                if len(complete) >= self.max_lines:
+                    self._render()
+                else:
+                    self._append(pending, len(complete))
+        finally:
+            self.root.after(self.flush_ms, self._drain)
+
+    def _following(self):
+        # Only keep scrolling to the end if the user has not scrolled up
+        return self.text.yview()[1] >= 0.999
+
+    def _append(self, pending, new_lines):
+        follow = self._following()
+        self.text.configure(state="normal")
+        self.text.insert("end", pending)
+        excess = self._shown_lines + new_lines - self.max_lines
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+        self.text.configure(state="disabled")
+        self._shown_lines = min(self.max_lines, self._shown_lines + new_lines)
+        if follow:
+            self.text.see("end")
+
+    def _render(self):
+        # Rebuilds the pane from the ring buffer
+        follow = self._following()
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("end", "\n".join(self.lines) + ("\n" if self.lines else "") + self._partial)
+        self.text.configure(state="disabled")
+        self._shown_lines = len(self.lines)
+        if follow:
+            self.text.see("end")
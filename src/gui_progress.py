@@ -0,0 +1,62 @@
+# gui_progress.py
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+
+POLL_INTERVAL_MS = 250
+
+
+class JobPanel(ttk.Frame):
+    """
+    Determinate progress bar, count/rate/ETA line and Pause/Cancel buttons
+    for a JobController. The Tk loop polls the job's snapshot, so the
+    worker thread never touches the widgets.
+    """
+
+    def __init__(self, master, bar_length=220):
+        super().__init__(master)
+        self.job = None
+        self.bar = ttk.Progressbar(self, mode="determinate", bootstyle="info-striped", length=bar_length)
+        self.bar.grid(row=0, column=0, padx=(0, 5))
+        self.pause_button = ttk.Button(self, text="Pause", command=self.toggle_pause, bootstyle=SECONDARY, width=7)
+        self.pause_button.grid(row=0, column=1, padx=2)
+        self.cancel_button = ttk.Button(self, text="Cancel", command=self.cancel, bootstyle=DANGER, width=7)
+        self.cancel_button.grid(row=0, column=2, padx=2)
+        self.status = ttk.Label(self, text="", font=("Segoe UI", 8))
+        self.status.grid(row=1, column=0, columnspan=3, sticky="w")
+
+    def watch(self, job):
+        self.job = job
+        self.bar.configure(value=0, maximum=1)
+        self.pause_button.configure(text="Pause", state="normal")
+        self.cancel_button.configure(state="normal")
+        self.grid()
+        self._poll()
+
+    def toggle_pause(self):
+        if self.job is None:
+            return
+        if self.job.paused:
+            self.job.resume()
+            self.pause_button.configure(text="Pause")
+        else:
+            self.job.pause()
+            self.pause_button.configure(text="Resume")
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.pause_button.configure(state="disabled")
+            self.cancel_button.configure(state="disabled")
+
+    def _poll(self):
+        if self.job is None:
+            return
+        snapshot = self.job.snapshot()
+        self.bar.configure(maximum=max(1, snapshot["total"]), value=snapshot["done"])
+        self.status.configure(text=self.job.status_line())
+        if snapshot["state"] in ("done", "cancelled"):
+            self.pause_button.configure(state="disabled")
+            self.cancel_button.configure(state="disabled")
+            self.job = None
+            return
+        self.after(POLL_INTERVAL_MS, self._poll)
@@ -0,0 +1,68 @@
+# image_loader.py
+import numpy as np
+from PIL import Image
+
+# Reduced-size decoding is only used while every capture box stays at
+# least this many pixels tall, so OCR still gets enough detail
+MIN_REGION_HEIGHT = 48
+DRAFT_REDUCTIONS = (8, 4, 2)
+
+
+def normalize_box(coords):
+    x1, y1, x2, y2 = coords
+    return (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+
+
+def draft_reduction(boxes, min_height=MIN_REGION_HEIGHT):
+    """Largest JPEG decode reduction (1, 2, 4 or 8) that keeps every box at least `min_height` px tall."""
+    smallest = min((abs(box[3] - box[1]) for box in boxes), default=0)
+    for reduction in DRAFT_REDUCTIONS:
+        if smallest / reduction >= min_height:
+            return reduction
+    return 1
+
+
+def load_gray(path, reduction=1, min_side=None):
+    """
+    Decodes an image once, straight to 8-bit grayscale.
+
+    JPEGs use draft mode: libjpeg decodes only the luminance channel and,
+    with `reduction` > 1, scales down while decoding instead of decoding
+    full size and resizing afterwards. Other formats are decoded normally.
+    With `min_side`, the largest reduction that keeps the shorter side at
+    least that long is used instead. The file is closed before returning.
+
+    Returns:
+        (pixels, scale): 2-D uint8 array and the factor that maps original
+        image coordinates onto it.
+    """
+    with Image.open(path) as img:
+        width = img.width
+        if min_side:
+            reduction = next((r for r in DRAFT_REDUCTIONS if min(img.size) // r >= min_side), 1)
+        img.draft("L", (max(1, img.width // reduction), max(1, img.height // reduction)))
+        gray = img if img.mode == "L" else img.convert("L")
+        pixels = np.asarray(gray)
+    return pixels, pixels.shape[1] / width
+
+
+def region_views(pixels, scale, boxes):
+    """Zero-copy views into `pixels` for boxes given in original image coordinates."""
+    views = []
+    for box in boxes:
+        x1, y1, x2, y2 = (round(v * scale) for v in normalize_box(box))
+        views.append(pixels[max(0, y1):max(0, y2), max(0, x1):max(0, x2)])
+    return views
+
+
+def load_regions(path, boxes, reduction=1):
+    """Decodes `path` once and returns a grayscale view per box."""
+    pixels, scale = load_gray(path, reduction)
+    return region_views(pixels, scale, boxes)
+
+
+def load_display_image(path):
+    """Fully decodes an image for on-screen display and closes the file."""
+    with Image.open(path) as img:
+        img.load()
+    return img
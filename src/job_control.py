@@ -0,0 +1,110 @@
+# job_control.py
+import threading
+import time
+from collections import deque
+
+# Rate and ETA are computed over roughly this many recent seconds, so they
+# follow slowdowns (rate limiting, a slow share) instead of the whole-run average
+RATE_WINDOW_SECONDS = 30.0
+
+
+class JobController:
+    """
+    Progress, rate, ETA and cooperative pause/cancel for one long job.
+
+    The worker reports with `start(total)` and `advance()`, and calls
+    `proceed()` before starting each new unit of work: it blocks while the
+    job is paused and returns False once it is cancelled, so the worker
+    stops taking new work and finishes what it already started. Any
+    thread may read `snapshot()` or call `pause()`, `resume()` and
+    `cancel()`.
+    """
+
+    def __init__(self, label="items"):
+        self.label = label
+        self.total = 0
+        self.done = 0
+        self.started = None
+        self.finished = None
+        self._samples = deque()  # (time, done)
+        self._lock = threading.Lock()
+        self._running = threading.Event()
+        self._running.set()
+        self._cancelled = threading.Event()
+
+    def start(self, total):
+        with self._lock:
+            self.total = total
+            self.done = 0
+            self.started = time.monotonic()
+            self.finished = None
+            self._samples = deque([(self.started, 0)])
+
+    def advance(self, count=1):
+        now = time.monotonic()
+        with self._lock:
+            self.done += count
+            self._samples.append((now, self.done))
+            while len(self._samples) > 2 and now - self._samples[0][0] > RATE_WINDOW_SECONDS:
+                self._samples.popleft()
+
+    def finish(self):
+        with self._lock:
+            if self.finished is None:
+                self.finished = time.monotonic()
+
+    def proceed(self):
+        """Blocks while paused; False once the job is cancelled."""
+        while not self._running.wait(0.2):
+            if self._cancelled.is_set():
+                return False
+        return not self._cancelled.is_set()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def cancel(self):
+        self._cancelled.set()
+        # Wake a paused worker so it can see the cancellation
+        self._running.set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def snapshot(self):
+        """Dict with done, total, elapsed, rate (per second), eta (seconds or None) and state."""
+        with self._lock:
+            now = self.finished or time.monotonic()
+            elapsed = now - self.started if self.started else 0.0
+            samples = self._samples or [(now, 0)]
+            (t0, d0), (t1, d1) = samples[0], samples[-1]
+            rate = (d1 - d0) / (t1 - t0) if t1 > t0 else 0.0
+            remaining = max(0, self.total - self.done)
+            eta = remaining / rate if rate > 0 and self.finished is None else None
+            done, total = self.done, self.total
+        if self.finished:
+            state = "cancelled" if self.cancelled else "done"
+        else:
+            state = "cancelling" if self.cancelled else "paused" if self.paused else "running"
+        return {"done": done, "total": total, "elapsed": elapsed, "rate": rate, "eta": eta, "state": state}
+
+    def status_line(self):
+        s = self.snapshot()
+        percent = 100 * s["done"] / s["total"] if s["total"] else 0
+        eta = format_duration(s["eta"]) if s["eta"] is not None else "--:--"
+        line = f"{s['done']}/{s['total']} {self.label} ({percent:.0f}%), {s['rate']:.1f} {self.label}/s, ETA {eta}"
+        return line if s["state"] == "running" else f"{line} [{s['state']}]"
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
@@ -1,26 +1,31 @@
 import sys
-import io
+import os
 import csv
+import multiprocessing
 import threading
-import shutil
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
-from PIL import Image
-import pytesseract
 
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 
 from tkinter import filedialog, messagebox
 
-from ocr_utils import sanitize_card_name
 from region_selector import RegionSelector
-from session_logger import start_log
-from csv_logger import save_card_summary_to_csv
-from price_lookup import update_csv_with_prices
+from region_template import save_template, TEMPLATE_FILENAME
+from price_lookup import update_csv_with_prices, DEFAULT_WORKERS, DEFAULT_RATE_LIMIT
 from config_utils import load_config, save_config
-from ebay_provider import EbayMedianProvider, EbayLastSoldProvider
-from fuzzy_utils import load_card_list, fuzzy_match_name
+from gui_log import GuiLog, MAX_LINES as DEFAULT_LOG_LINES
+from gui_progress import JobPanel
+from job_control import JobController
+from ebay_provider import EbayMedianProvider, EbayLastSoldProvider, EbayTrimmedMeanProvider
+from ocr_cache import open_ocr_cache, DEFAULT_MAX_ENTRIES as DEFAULT_OCR_CACHE_ENTRIES
+from phash_index import DEFAULT_MAX_DISTANCE
+from preprocess import DEFAULT_PRESET
+from price_aggregator import PriceAggregator, DEFAULT_TIMEOUT_SECONDS
+from price_cache import CachedPriceProvider, open_price_cache, DEFAULT_TTL_HOURS, DEFAULT_MAX_ENTRIES
+from scan_pipeline import find_images, run_scan
+from session_logger import start_log
 
 
 class CardScannerApp:
@@ -31,11 +36,32 @@ class CardScannerApp:
         self.excel_path = ttk.StringVar()
         self.provider_name = ttk.StringVar()
         self.column_name = ttk.StringVar()
-
-        self.providers = {
-            EbayMedianProvider().name(): EbayMedianProvider(),
-            EbayLastSoldProvider().name(): EbayLastSoldProvider()
-        }
+        self.ocr_workers = config.get("ocr_workers", os.cpu_count() or 1)
+        self.ocr_backend = config.get("ocr_backend", "auto")
+        self.fuzzy_mode = config.get("fuzzy_mode", "indexed")
+        self.align_cards = config.get("align_cards", False)
+        self.duplicates = config.get("duplicates", "off")
+        self.duplicate_distance = config.get("duplicate_distance", DEFAULT_MAX_DISTANCE)
+        self.output_mode = config.get("output_mode", "copy")
+        self.ocr_preprocess = config.get("ocr_preprocess", DEFAULT_PRESET)
+        self.region_preprocess = config.get("region_preprocess", {})
+        self.ocr_cache_max_entries = config.get("ocr_cache_max_entries", DEFAULT_OCR_CACHE_ENTRIES)
+        self.ocr_cache = open_ocr_cache(self.ocr_cache_max_entries)
+        self.price_workers = config.get("price_workers", DEFAULT_WORKERS)
+        self.price_rate_limit = config.get("price_rate_limit", DEFAULT_RATE_LIMIT)
+        self.log_max_lines = config.get("log_max_lines", DEFAULT_LOG_LINES)
+        self.mirror_console_log = config.get("mirror_console_log", False)
+        self.profile_runs = config.get("profile", False)
+
+        self.price_cache_ttl_hours = config.get("price_cache_ttl_hours", DEFAULT_TTL_HOURS)
+        self.price_cache_max_entries = config.get("price_cache_max_entries", DEFAULT_MAX_ENTRIES)
+        self.price_timeout_seconds = config.get("price_timeout_seconds", DEFAULT_TIMEOUT_SECONDS)
+        strategies = [EbayMedianProvider(), EbayLastSoldProvider(), EbayTrimmedMeanProvider()]
+        price_cache = open_price_cache(self.price_cache_ttl_hours, self.price_cache_max_entries) if self.price_cache_ttl_hours > 0 else None
+        providers = [CachedPriceProvider(p, price_cache) for p in strategies] if price_cache is not None else list(strategies)
+        # One search, a price column per strategy
+        providers.append(PriceAggregator(strategies, cache=price_cache, timeout=self.price_timeout_seconds))
+        self.providers = {p.name(): p for p in providers}
         default_provider = config.get("price_provider", list(self.providers.keys())[0])
         self.provider_name.set(default_provider if default_provider in self.providers else list(self.providers.keys())[0])
 
@@ -58,9 +84,9 @@ class CardScannerApp:
 
         self.scan_button = ttk.Button(self.root, text="Start Scan", command=self.start_scan, bootstyle=SUCCESS, width=18, padding=(10, 5))
         self.scan_button.grid(row=2, column=1, pady=10)
-        self.spinner = ttk.Progressbar(self.root, mode='indeterminate', bootstyle="info-striped")
-        self.spinner.grid(row=2, column=2, pady=10)
-        self.spinner.grid_remove()
+        self.scan_progress = JobPanel(self.root)
+        self.scan_progress.grid(row=2, column=2, columnspan=2, sticky="w", pady=10)
+        self.scan_progress.grid_remove()
 
         ttk.Label(self.root, text="CSV File for Price Lookup:", font=("Segoe UI", 10, "bold")).grid(row=3, column=0, sticky="e", **padding)
         ttk.Entry(self.root, textvariable=self.excel_path, width=50).grid(row=3, column=1, **padding)
@@ -77,23 +103,33 @@ class CardScannerApp:
 
         self.price_button = ttk.Button(self.root, text="Get Price Data", command=self.fetch_prices, bootstyle=INFO, width=18, padding=(10, 5))
         self.price_button.grid(row=5, column=2, pady=10)
-        self.price_spinner = ttk.Progressbar(self.root, mode='indeterminate', bootstyle="info-striped")
-        self.price_spinner.grid(row=5, column=3, pady=10)
-        self.price_spinner.grid_remove()
+        self.price_progress = JobPanel(self.root, bar_length=160)
+        self.price_progress.grid(row=5, column=3, sticky="w", pady=10)
+        self.price_progress.grid_remove()
 
         self.output_text = ttk.Text(self.root, height=12, width=80, state='disabled', font=("Consolas", 9))
         self.output_text.grid(row=6, column=0, columnspan=4, padx=10, pady=(0, 10))
 
     def redirect_stdout(self):
-        class StdoutRedirector(io.StringIO):
-            def write(inner_self, msg):
-                self.output_text.configure(state='normal')
-                self.output_text.insert("end", msg)
-                self.output_text.see("end")
-                self.output_text.configure(state='disabled')
-
-        sys.stdout = StdoutRedirector()
-        sys.stderr = sys.stdout
+        # Worker threads print freely; GuiLog queues their output and the
+        # Tk loop inserts it in batches
+        self.log = GuiLog(self.root, self.output_text, max_lines=self.log_max_lines)
+        sys.stdout = self.log
+        sys.stderr = self.log
+
+    @contextmanager
+    def mirrored_log(self, folder):
+        # With mirror_console_log on, console output is also copied to
+        # console_log_<time>.txt in `folder` while the block runs
+        if not self.mirror_console_log:
+            yield
+            return
+        with start_log(folder, prefix="console_log") as log_file:
+            self.log.mirror_to(log_file)
+            try:
+                yield
+            finally:
+                self.log.mirror_to(None)
 
     def select_input_folder(self):
         folder = filedialog.askdirectory()
@@ -108,11 +144,31 @@ class CardScannerApp:
             self.save_current_config()
 
     def save_current_config(self):
-        save_config({
+        config = load_config()
+        config.update({
             "input_path": self.input_path.get(),
             "output_path": self.output_path.get(),
-            "price_provider": self.provider_name.get()
+            "price_provider": self.provider_name.get(),
+            "ocr_workers": self.ocr_workers,
+            "ocr_backend": self.ocr_backend,
+            "fuzzy_mode": self.fuzzy_mode,
+            "align_cards": self.align_cards,
+            "duplicates": self.duplicates,
+            "duplicate_distance": self.duplicate_distance,
+            "output_mode": self.output_mode,
+            "ocr_preprocess": self.ocr_preprocess,
+            "region_preprocess": self.region_preprocess,
+            "ocr_cache_max_entries": self.ocr_cache_max_entries,
+            "price_workers": self.price_workers,
+            "price_rate_limit": self.price_rate_limit,
+            "log_max_lines": self.log_max_lines,
+            "mirror_console_log": self.mirror_console_log,
+            "profile": self.profile_runs,
+            "price_cache_ttl_hours": self.price_cache_ttl_hours,
+            "price_cache_max_entries": self.price_cache_max_entries,
+            "price_timeout_seconds": self.price_timeout_seconds
         })
+        save_config(config)
 
     def select_excel_file(self):
         file = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
@@ -134,23 +190,22 @@ class CardScannerApp:
     def start_scan(self):
         self.clear_output()
         self.scan_button.config(text="Scanning...", state="disabled")
-        self.spinner.grid()
-        self.spinner.start(10)
+        job = JobController("images")
+        self.scan_progress.watch(job)
 
         def run_scan():
             try:
-                self.perform_scan()
+                self.perform_scan(job)
             finally:
+                job.finish()
                 self.root.after(0, self.reset_scan_button)
 
         threading.Thread(target=run_scan, daemon=True).start()
 
     def reset_scan_button(self):
-        self.spinner.stop()
-        self.spinner.grid_remove()
         self.scan_button.config(text="Start Scan", state="normal")
 
-    def perform_scan(self):
+    def perform_scan(self, job=None):
         in_dir = Path(self.input_path.get())
         out_dir = Path(self.output_path.get())
 
@@ -158,78 +213,39 @@ class CardScannerApp:
             messagebox.showerror("Error", "Please select valid directories.")
             return
 
-        images_dir = out_dir / "images"
-        images_dir.mkdir(parents=True, exist_ok=True)
-
-        images = list(in_dir.glob("*.jpg")) + list(in_dir.glob("*.png"))
+        images = find_images(in_dir)
         if not images:
             messagebox.showinfo("No Images", "No images found in the input folder.")
             return
 
-        selector = RegionSelector(images)
+        selector = RegionSelector(images, align=self.align_cards)
         capture_data = selector.get_capture_data()  # (name, coords, fuzzy_type)
         if not capture_data:
             messagebox.showerror("Error", "No regions selected.")
             return
 
-        fuzzy_cache = {}
-
-        log_file = start_log(out_dir)
-        log_file.write(f"Scan started at {datetime.now()}\n")
-        for name, coords, fuzzy in capture_data:
-            log_file.write(f"Capture: {name} = {coords} (fuzzy: {fuzzy})\n")
-        log_file.write("\n")
-
-        card_entries = []
-
-        for idx, img_path in enumerate(images, start=1):
-            log_file.write(f"[{img_path.name}] ")
-            img = Image.open(img_path)
-            entry = {"input_path": str(img_path)}
-
-            for name, coords, fuzzy in capture_data:
-                x1, y1, x2, y2 = coords
-                cropped = img.crop((min(x1,x2), min(y1,y2), max(x1,x2), max(y1,y2))).convert("L")
-                text = pytesseract.image_to_string(cropped, config="--psm 7").strip()
-                entry[name] = text
-
-                if fuzzy != "No Fuzzy Matching":
-                    if fuzzy not in fuzzy_cache:
-                        try:
-                            fuzzy_cache[fuzzy] = load_card_list(fuzzy)
-                        except Exception as e:
-                            print(f"Warning: failed to load fuzzy list for {fuzzy}: {e}")
-                            fuzzy_cache[fuzzy] = []
-                    match = fuzzy_match_name(text, fuzzy_cache[fuzzy])
-                    entry[f"Fuzzy {name}"] = match
-
-            primary_field = capture_data[0][0]
-            card_name = entry.get(primary_field, "").strip()
-            safe_name = sanitize_card_name(card_name)
-            if not safe_name or safe_name.lower() == "unknowncard":
-                safe_name = f"SCAN_{idx}"
-
-            new_path = images_dir / f"{safe_name}{img_path.suffix.lower()}"
-            i = 1
-            while new_path.exists():
-                new_path = images_dir / f"{safe_name}_{i}{img_path.suffix.lower()}"
-                i += 1
-
-            shutil.copy(img_path, new_path)
-            entry["output_path"] = str(new_path)
-            log_file.write(f"→ OCR → Saved as: {new_path.name}\n")
-            card_entries.append(entry)
-
-        log_file.write(f"\nScan complete. {len(images)} images processed.\n")
-        log_file.write(f"{len(card_entries)} entries recorded.\n")
-        log_file.close()
-
-        csv_filename = save_card_summary_to_csv(out_dir, card_entries)
-        self.excel_path.set(str(out_dir / csv_filename))
-        self.update_column_dropdown(out_dir / csv_filename)
-
-        messagebox.showinfo("Scan Complete", f"Processed {len(images)} cards.\nSummary saved to {csv_filename}")
-
+        # Saved so the same regions can be reused for headless runs (cli.py)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        save_template(out_dir / TEMPLATE_FILENAME, capture_data, self.region_preprocess, aligned=self.align_cards)
+
+        with self.mirrored_log(out_dir):
+            summary = run_scan(
+                images, out_dir, capture_data,
+                workers=self.ocr_workers, backend=self.ocr_backend, fuzzy_mode=self.fuzzy_mode,
+                preprocess=self.ocr_preprocess, region_preprocess=self.region_preprocess, align=self.align_cards,
+                duplicates=self.duplicates, duplicate_distance=self.duplicate_distance, output_mode=self.output_mode,
+                ocr_cache=self.ocr_cache, job=job, profile=self.profile_runs
+            )
+
+        csv_path = Path(summary["csv_path"])
+        self.excel_path.set(str(csv_path))
+        self.update_column_dropdown(csv_path)
+
+        if summary["cancelled"]:
+            messagebox.showinfo("Scan Cancelled", f"Stopped after {job.done} of {len(images)} cards.\n"
+                                f"Summary saved to {csv_path.name}; start the scan again to resume.")
+        else:
+            messagebox.showinfo("Scan Complete", f"Processed {len(images)} cards.\nSummary saved to {csv_path.name}")
 
     def fetch_prices(self):
         self.clear_output()
@@ -248,30 +264,38 @@ class CardScannerApp:
             return
 
         self.price_button.config(text="Fetching...", state="disabled")
-        self.price_spinner.grid()
-        self.price_spinner.start(10)
+        job = JobController("cards")
+        self.price_progress.watch(job)
 
         def run_fetch():
             try:
-                updated_path = update_csv_with_prices(Path(csv_file), provider, column)
-                self.root.after(0, lambda: messagebox.showinfo("Success", f"Prices updated in file:\n{updated_path}"))
+                summary = {}
+                with self.mirrored_log(Path(csv_file).parent):
+                    updated_path = update_csv_with_prices(
+                        Path(csv_file), provider, column,
+                        workers=self.price_workers, rate_limit=self.price_rate_limit, summary=summary, job=job,
+                        profile=self.profile_runs
+                    )
+                if summary.get("cancelled"):
+                    message = f"Price lookup cancelled; {summary['unpriced']} rows have no price.\nSaved to:\n{updated_path}"
+                    self.root.after(0, lambda: messagebox.showinfo("Cancelled", message))
+                else:
+                    self.root.after(0, lambda: messagebox.showinfo("Success", f"Prices updated in file:\n{updated_path}"))
             finally:
+                job.finish()
                 self.root.after(0, self.reset_price_button)
 
         threading.Thread(target=run_fetch, daemon=True).start()
 
     def reset_price_button(self):
-        self.price_spinner.stop()
-        self.price_spinner.grid_remove()
         self.price_button.config(text="Get Price Data", state="normal")
 
     def clear_output(self):
-        self.output_text.configure(state='normal')
-        self.output_text.delete("1.0", "end")
-        self.output_text.configure(state='disabled')
+        self.log.clear()
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # required for the OCR worker pool in the PyInstaller build
     app = ttk.Window(themename="superhero", title="Card Scanner")
     CardScannerApp(app)
     app.mainloop()
@@ -0,0 +1,110 @@
+# ocr_backends.py
+import threading
+from abc import ABC, abstractmethod
+
+from PIL import Image
+import pytesseract
+
+try:
+    import tesserocr
+    HAS_TESSEROCR = True
+except ImportError:
+    HAS_TESSEROCR = False
+
+PSM_SINGLE_LINE = 7
+
+
+class OcrBackend(ABC):
+    @abstractmethod
+    def name(self):
+        pass
+
+    @abstractmethod
+    def image_to_string(self, image, psm=PSM_SINGLE_LINE, whitelist=None) -> str:
+        pass
+
+    def close(self):
+        pass
+
+
+class PytesseractBackend(OcrBackend):
+    """Runs the tesseract executable once per call (the original behaviour)."""
+
+    def name(self):
+        return "pytesseract"
+
+    def image_to_string(self, image, psm=PSM_SINGLE_LINE, whitelist=None) -> str:
+        config = f"--psm {psm}"
+        if whitelist:
+            config += f" -c tessedit_char_whitelist={whitelist}"
+        return pytesseract.image_to_string(image, config=config)
+
+
+class TesserocrBackend(OcrBackend):
+    """
+    Keeps one initialized tesseract engine in memory via the C API.
+
+    Images are handed over from memory, so there is no temp file, no
+    subprocess and no language data reload per call. An instance is not
+    thread-safe; use `get_ocr_backend` to get one per thread/process.
+    """
+
+    def __init__(self, lang="eng"):
+        self.lang = lang
+        self._api = tesserocr.PyTessBaseAPI(lang=lang)
+
+    def name(self):
+        return "tesserocr"
+
+    def image_to_string(self, image, psm=PSM_SINGLE_LINE, whitelist=None) -> str:
+        if not isinstance(image, Image.Image):
+            image = Image.fromarray(image)
+        self._api.SetPageSegMode(psm)
+        self._api.SetVariable("tessedit_char_whitelist", whitelist or "")
+        self._api.SetImage(image)
+        return self._api.GetUTF8Text()
+
+    def close(self):
+        self._api.End()
+
+
+OCR_BACKENDS = ["auto", "tesserocr", "pytesseract"]
+
+_local = threading.local()
+
+
+def create_ocr_backend(name="auto"):
+    if name not in OCR_BACKENDS:
+        raise ValueError(f"Unknown OCR backend: {name}")
+
+    if name in ("auto", "tesserocr") and HAS_TESSEROCR:
+        try:
+            return TesserocrBackend()
+        except Exception as e:
+            print(f"Warning: tesserocr unavailable ({e}), falling back to pytesseract")
+    elif name == "tesserocr":
+        print("Warning: tesserocr is not installed, falling back to pytesseract")
+
+    return PytesseractBackend()
+
+
+def resolve_ocr_backend(name="auto"):
+    """Name of the backend `create_ocr_backend(name)` will normally return."""
+    if name in ("auto", "tesserocr") and HAS_TESSEROCR:
+        return "tesserocr"
+    return "pytesseract"
+
+
+def ocr_config_key(name="auto", psm=PSM_SINGLE_LINE, whitelist=None):
+    # Identifies everything about an OCR call that can change its output
+    return f"{resolve_ocr_backend(name)}:psm={psm}:whitelist={whitelist or ''}"
+
+
+def get_ocr_backend(name="auto"):
+    """Returns the backend for the current thread, creating it on first use."""
+    backends = getattr(_local, "backends", None)
+    if backends is None:
+        backends = _local.backends = {}
+    if name not in backends:
+        backends[name] = create_ocr_backend(name)
+    return backends[name]
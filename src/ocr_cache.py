@@ -0,0 +1,38 @@
+# ocr_cache.py
+from pathlib import Path
+
+from sqlite_cache import SqliteCache
+
+OCR_CACHE_FILE = Path.home() / ".card_scanner_ocr_cache.sqlite"
+DEFAULT_MAX_ENTRIES = 200000
+
+# Bump when OCR output for the same inputs would change (e.g. a tesseract
+# upgrade) to stop reusing old results
+OCR_CACHE_VERSION = 1
+
+
+def open_ocr_cache(max_entries=DEFAULT_MAX_ENTRIES, path=OCR_CACHE_FILE):
+    if not max_entries:
+        return None
+    try:
+        return SqliteCache(path, max_entries=max_entries)
+    except Exception as e:
+        print(f"Warning: OCR cache disabled ({e})")
+        return None
+
+
+def ocr_cache_key(digest, box, preprocess, ocr_config):
+    """
+    Key for one OCR'd region: image content hash, crop box, preprocessing
+    and tesseract settings. Any change to one of them is a cache miss.
+    """
+    box = ",".join(str(int(v)) for v in box)
+    return f"v{OCR_CACHE_VERSION}|{digest}|{box}|{preprocess}|{ocr_config}"
+
+
+def cache_summary(cache):
+    return {"hits": cache.hits, "misses": cache.misses, "hit_rate": round(cache.hit_rate(), 3)}
+
+
+def cache_summary_line(cache):
+    return f"OCR cache: {cache.hits} hits, {cache.misses} misses ({100 * cache.hit_rate():.0f}% hit rate)"
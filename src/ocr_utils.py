@@ -1,43 +1,41 @@
 # ocr_utils.py
 from PIL import Image, ImageEnhance, ImageFilter
-import pytesseract
 import re
 
-try:
-    import cv2
-    import numpy as np
-    HAS_CV2 = True
-except ImportError:
-    HAS_CV2 = False
+from image_loader import load_regions
+from ocr_backends import get_ocr_backend, ocr_config_key
+from ocr_cache import ocr_cache_key
+from preprocess import preprocess, resolve_steps, steps_key, HAS_CV2
+from scan_checkpoint import file_digest
 
-def extract_card_name(image_path, crop_coords):
+ALPHANUMERIC = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+
+def extract_card_name(image_path, crop_coords, backend="auto", cache=None, steps="legacy"):
     try:
-        with Image.open(image_path) as img:
-            cropped = img.crop(crop_coords)
-
-            if HAS_CV2:
-                # Convert PIL image to OpenCV format
-                open_cv_image = cv2.cvtColor(np.array(cropped), cv2.COLOR_RGB2BGR)
-                gray = cv2.cvtColor(open_cv_image, cv2.COLOR_BGR2GRAY)
-
-                # Resize for better OCR accuracy
-                scaled = cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_LINEAR)
-
-                # Apply adaptive thresholding
-                thresh = cv2.adaptiveThreshold(
-                    scaled, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                    cv2.THRESH_BINARY, 11, 2
-                )
-
-                text = pytesseract.image_to_string(
-                    thresh,
-                    config="--psm 7 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
-                )
-                return text.strip()
-            else:
-                gray = cropped.convert("L")
-                enhanced = gray.filter(ImageFilter.SHARPEN)
-                return pytesseract.image_to_string(enhanced, config="--psm 7").strip()
+        steps = resolve_steps(steps)
+        # Without OpenCV the steps are skipped; sharpen with PIL instead
+        processing = steps_key(steps) if HAS_CV2 else "sharpen"
+        whitelist = ALPHANUMERIC if HAS_CV2 else None
+
+        if cache is not None:
+            # Same image bytes, box and settings always give the same text
+            key = ocr_cache_key(file_digest(image_path), crop_coords, f"gray|{processing}", ocr_config_key(backend, whitelist=whitelist))
+            text = cache.get(key)
+            if text is None:
+                text = extract_card_name(image_path, crop_coords, backend, steps=steps)
+                if text is not None:
+                    cache.set(key, text)
+            return text
+
+        ocr = get_ocr_backend(backend)
+        # Decoded straight to grayscale; the region is a view, not a copy
+        gray = load_regions(image_path, [crop_coords])[0]
+
+        if HAS_CV2:
+            return ocr.image_to_string(preprocess(gray, steps), whitelist=whitelist).strip()
+        else:
+            enhanced = Image.fromarray(gray).filter(ImageFilter.SHARPEN)
+            return ocr.image_to_string(enhanced).strip()
 
     except Exception as e:
         print(f"OCR failed for {image_path}: {e}")
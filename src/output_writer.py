@@ -0,0 +1,166 @@
+# output_writer.py
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+OUTPUT_MODES = ["copy", "link", "move"]
+DEFAULT_IO_WORKERS = 4
+# Transfers kept in flight per I/O worker before the pipeline waits
+TRANSFERS_PER_WORKER = 4
+
+
+def copy_file(src, dest):
+    """shutil.copy, but letting the kernel copy (or reflink) the data where it can."""
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dest, "wb") as fdest:
+                while os.copy_file_range(fsrc.fileno(), fdest.fileno(), 1 << 30):
+                    pass
+            shutil.copymode(src, dest)
+            return
+        except OSError:
+            pass  # old kernel, or a filesystem pair it cannot handle
+    shutil.copy(src, dest)
+
+
+class OutputWriter:
+    """
+    Writes renamed images into the output images/ folder.
+
+    The folder is listed once and free names are handed out from an
+    in-memory index, so a name that collides with thousands of earlier
+    scans costs no stat calls. Files are transferred on a small thread
+    pool:
+
+    - "copy": a full copy; on Linux via copy_file_range, which reflinks on
+      btrfs/XFS and copies server-side on NFS and SMB shares
+    - "link": a hard link when the input is on the same filesystem, else
+      a copy
+    - "move": a rename on the same filesystem, else a copy and delete
+
+    Names are claimed with exclusive creates, so a file written into the
+    folder by someone else during the scan is never overwritten.
+    """
+
+    def __init__(self, images_dir: Path, mode="copy", workers=DEFAULT_IO_WORKERS, stats=None):
+        if mode not in OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode: {mode}")
+        self.images_dir = images_dir
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.stats = stats
+        self.linked = self.copied = self.moved = 0
+        self._can_link = mode != "copy"
+        self._lock = threading.Lock()
+        # Lowercased so names that only differ in case never collide on
+        # case-insensitive filesystems
+        with os.scandir(images_dir) as entries:
+            self._taken = {entry.name.lower() for entry in entries}
+        self._next_suffix = {}
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="output")
+
+    def reserve(self, stem, suffix):
+        """Returns the first free path `stem`, `stem_1`, `stem_2`, ... and marks it taken."""
+        key = stem.lower()
+        with self._lock:
+            name = f"{stem}{suffix}"
+            i = self._next_suffix.get(key, 1)
+            if name.lower() in self._taken:
+                while f"{stem}_{i}{suffix}".lower() in self._taken:
+                    i += 1
+                name = f"{stem}_{i}{suffix}"
+                i += 1
+            self._next_suffix[key] = i
+            self._taken.add(name.lower())
+        return self.images_dir / name
+
+    def submit(self, src: Path, stem):
+        """Starts writing `src` into the folder as `stem`; the future resolves to the final path."""
+        # Names are reserved here, in submission order, so numbering does
+        # not depend on which transfer finishes first
+        suffix = src.suffix.lower()
+        return self._pool.submit(self._write, src, self.reserve(stem, suffix), stem, suffix)
+
+    def _write(self, src, dest, stem, suffix):
+        start = time.perf_counter()
+        while True:
+            try:
+                self._transfer(src, dest)
+                break
+            except FileExistsError:
+                # Created behind our back since the folder was listed
+                dest = self.reserve(stem, suffix)
+        if self.stats is not None:
+            self.stats.add(f"output {self.mode}", time.perf_counter() - start)
+        return dest
+
+    def _transfer(self, src, dest):
+        if self._can_link:
+            try:
+                os.link(src, dest)
+                if self.mode == "move":
+                    # Link + unlink is a rename that fails instead of
+                    # replacing an existing file
+                    os.unlink(src)
+                self._count(self.mode)
+                return
+            except FileExistsError:
+                raise
+            except OSError:
+                # Other filesystem, or one without hard links; stop trying
+                self._can_link = False
+
+        # Claim the name first, then fill it in
+        os.close(os.open(dest, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        try:
+            if self.mode == "move":
+                try:
+                    os.replace(src, dest)
+                except OSError:
+                    copy_file(src, dest)
+                    os.unlink(src)
+            else:
+                copy_file(src, dest)
+            self._count("move" if self.mode == "move" else "copy")
+        except BaseException:
+            if self.mode != "move" or src.exists():
+                dest.unlink(missing_ok=True)
+            raise
+
+    def _count(self, kind):
+        with self._lock:
+            if kind == "link":
+                self.linked += 1
+            elif kind == "move":
+                self.moved += 1
+            else:
+                self.copied += 1
+
+    def write_all(self, items, window=None):
+        """
+        Writes every (src, stem, item) in order and yields (item, path) as
+        each write completes, keeping a bounded number in flight.
+        """
+        window = window or self.workers * TRANSFERS_PER_WORKER
+        pending = deque()
+        for src, stem, item in items:
+            if src is None:
+                pending.append((item, None))
+            else:
+                pending.append((item, self.submit(src, stem)))
+            while pending and (len(pending) > window or pending[0][1] is None or pending[0][1].done()):
+                item, future = pending.popleft()
+                yield item, future.result() if future else None
+        while pending:
+            item, future = pending.popleft()
+            yield item, future.result() if future else None
+
+    def summary(self):
+        return {"mode": self.mode, "linked": self.linked, "copied": self.copied, "moved": self.moved}
+
+    def close(self):
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,174 @@
+# preprocess.py
+import time
+
+import numpy as np
+
+try:
+    import cv2
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+
+# Tesseract is most accurate with lowercase letters around this many pixels tall
+TARGET_X_HEIGHT = 24
+MAX_RESIZE = 4.0
+MAX_SKEW_DEGREES = 10.0
+MIN_SKEW_DEGREES = 0.5
+# Ink touching the crop edge and spanning this much of its width is card frame,
+# or the dark wedge a slightly rotated frame leaves in a corner
+FRAME_SPAN = 0.5
+MIN_SPECK_AREA = 4
+TRIM_PADDING = 4
+
+
+def ink_mask(img):
+    # Otsu split; text is assumed to be the minority class
+    _, binary = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    ink = binary == 0
+    return ~ink if ink.mean() > 0.5 else ink
+
+
+def text_ink(img):
+    """Ink mask without frame lines, dark borders and specks of noise."""
+    ink = ink_mask(img)
+    _, labels, stats, _ = cv2.connectedComponentsWithStats(ink.astype(np.uint8), connectivity=8)
+    x, y, w, h, area = stats.T
+    height, width = ink.shape
+    touches = (x == 0) | (y == 0) | (x + w >= width) | (y + h >= height)
+    # Vertical frame lines run from the top edge to the bottom edge; a
+    # letter cut by a tight crop rarely does
+    frame = touches & (w >= FRAME_SPAN * width) | (y == 0) & (y + h >= height)
+    keep = ~frame & (area >= MIN_SPECK_AREA)
+    keep[0] = False  # background label
+    return keep[labels]
+
+
+def deskew(img):
+    ys, xs = np.nonzero(text_ink(img))
+    if len(xs) < 20:
+        return img
+    # Orientation of the ink's principal axis is the baseline angle
+    cov = np.cov(np.vstack((xs, ys)).astype(np.float32))
+    angle = np.degrees(0.5 * np.arctan2(2 * cov[0, 1], cov[0, 0] - cov[1, 1]))
+    if not MIN_SKEW_DEGREES <= abs(angle) <= MAX_SKEW_DEGREES:
+        return img
+    h, w = img.shape
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    return cv2.warpAffine(img, matrix, (w, h), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
+def resize_to_x_height(img):
+    # Rows at least half as inky as the densest row approximate the x-height band
+    profile = text_ink(img).sum(axis=1)
+    if not profile.any():
+        return img
+    x_height = np.count_nonzero(profile >= profile.max() / 2)
+    scale = min(MAX_RESIZE, max(1 / MAX_RESIZE, TARGET_X_HEIGHT / x_height))
+    if 0.9 <= scale <= 1.1:
+        return img
+    interpolation = cv2.INTER_CUBIC if scale > 1 else cv2.INTER_AREA
+    return cv2.resize(img, None, fx=scale, fy=scale, interpolation=interpolation)
+
+
+def upscale(img):
+    return cv2.resize(img, None, fx=2, fy=2, interpolation=cv2.INTER_LINEAR)
+
+
+def denoise(img):
+    return cv2.medianBlur(img, 3)
+
+
+def threshold(img):
+    _, binary = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    # Light text on a dark frame is flipped to dark on light for tesseract
+    return 255 - binary if np.count_nonzero(binary) < binary.size / 2 else binary
+
+
+def adaptive_threshold(img):
+    return cv2.adaptiveThreshold(img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+
+
+def trim(img):
+    ys, xs = np.nonzero(text_ink(img))
+    if not len(xs):
+        return img
+    height, width = img.shape
+    y1, y2 = max(0, ys.min() - TRIM_PADDING), min(height, ys.max() + 1 + TRIM_PADDING)
+    x1, x2 = max(0, xs.min() - TRIM_PADDING), min(width, xs.max() + 1 + TRIM_PADDING)
+    return np.ascontiguousarray(img[y1:y2, x1:x2])
+
+
+STEPS = {
+    "deskew": deskew,
+    "resize": resize_to_x_height,
+    "upscale": upscale,
+    "denoise": denoise,
+    "threshold": threshold,
+    "adaptive_threshold": adaptive_threshold,
+    "trim": trim,
+}
+
+PRESETS = {
+    "none": (),
+    "standard": ("resize", "denoise", "threshold", "trim"),
+    "full": ("deskew", "resize", "denoise", "threshold", "trim"),
+    # What extract_card_name always did: 2x upscale + adaptive threshold
+    "legacy": ("upscale", "adaptive_threshold"),
+}
+DEFAULT_PRESET = "standard"
+
+_warned = False
+
+
+def resolve_steps(spec=DEFAULT_PRESET):
+    """Turns a preset name or a list of step names into a validated tuple of steps."""
+    steps = PRESETS.get(spec) if isinstance(spec, str) else tuple(spec or ())
+    if steps is None:
+        raise ValueError(f"Unknown preprocessing preset: {spec}")
+    for step in steps:
+        if step not in STEPS:
+            raise ValueError(f"Unknown preprocessing step: {step}")
+    return steps
+
+
+def parse_steps(text):
+    """Preset name or comma-separated steps, as typed on the command line."""
+    return text if text in PRESETS else resolve_steps(step.strip() for step in text.split(","))
+
+
+def region_steps(capture_data, default=DEFAULT_PRESET, overrides=None):
+    """Steps for each capture region: its entry in `overrides` if any, else `default`."""
+    overrides = overrides or {}
+    return [resolve_steps(overrides.get(name, default)) for name, _, _ in capture_data]
+
+
+def steps_key(steps):
+    return "+".join(steps) or "none"
+
+
+def preprocess(img, steps, timings=None):
+    """
+    Runs `steps` over a 2-D uint8 grayscale array and returns the result.
+
+    Time spent in each step is added to `timings` as
+    "preprocess <step>" -> [seconds, regions]. Without OpenCV the image is
+    returned unchanged.
+    """
+    global _warned
+    if not steps or img.size == 0:
+        return img
+    if not HAS_CV2:
+        if not _warned:
+            print("Warning: OpenCV is not installed, OCR preprocessing is disabled")
+            _warned = True
+        return img
+
+    img = np.ascontiguousarray(img)
+    for step in steps:
+        start = time.perf_counter()
+        img = STEPS[step](img)
+        if timings is not None:
+            stage = timings.setdefault(f"preprocess {step}", [0.0, 0])
+            stage[0] += time.perf_counter() - start
+            stage[1] += 1
+    return img
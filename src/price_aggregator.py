@@ -0,0 +1,146 @@
+# price_aggregator.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from price_cache import price_cache_key
+from price_providers import PriceProvider, ListingPriceProvider
+from stage_stats import StageStats
+
+AGGREGATE_NAME = "All Price Strategies"
+DEFAULT_TIMEOUT_SECONDS = 30.0
+# Concurrent fetches per listing source, across all lookup threads
+FETCHES_PER_SOURCE = 8
+
+
+class PriceAggregator(PriceProvider):
+    """
+    Prices each card with several ListingPriceProviders at once, one CSV
+    column each.
+
+    Providers with the same `listing_source` (e.g. the eBay median,
+    last-sold and trimmed-mean strategies) form a group: the listings are
+    fetched once and every strategy in the group prices that same set.
+    Groups are queried concurrently. A group that has not answered within
+    `timeout` seconds leaves its prices empty for that card without
+    holding up the others. With a `cache` (SqliteCache), every strategy's
+    price is cached under its own name, and a group is only fetched when
+    one of its strategies is missing.
+
+    Fetches run on a thread pool that is started on first use and shut
+    down by `close()` (or leaving a `with` block); queued fetches are
+    dropped then. A fetch that times out is cancelled if it has not
+    started yet.
+    """
+
+    def __init__(self, providers, cache=None, timeout=DEFAULT_TIMEOUT_SECONDS):
+        self.providers = list(providers)
+        for provider in self.providers:
+            if not isinstance(provider, ListingPriceProvider):
+                raise TypeError(f"{provider.name()} is not a ListingPriceProvider")
+        self.cache = cache
+        self.timeout = timeout
+        groups = {}
+        for i, provider in enumerate(self.providers):
+            groups.setdefault(provider.listing_source(), []).append(i)
+        self.groups = list(groups.values())
+        self._pool = None
+        self._lock = threading.Lock()
+        self.fetches = 0
+        self.hits = 0
+        self.misses = 0
+        self.timeouts = 0
+
+    def name(self):
+        return AGGREGATE_NAME
+
+    def price_names(self):
+        return [provider.name() for provider in self.providers]
+
+    def fetch_price(self, card_name: str) -> float:
+        return self.fetch_prices(card_name)[0]
+
+    def fetch_prices(self, card_name: str) -> list:
+        prices = [None] * len(self.providers)
+        pending = []
+        for group in self.groups:
+            missing = [i for i in group if not self._from_cache(i, card_name, prices)]
+            if missing:
+                pending.append((missing, self._submit(self._fetch_group, missing, card_name)))
+
+        deadline = time.monotonic() + self.timeout
+        for missing, future in pending:
+            try:
+                results = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                future.cancel()
+                with self._lock:
+                    self.timeouts += 1
+                names = ", ".join(self.providers[i].name() for i in missing)
+                print(f"{card_name}: no answer from {names} within {self.timeout:g}s")
+                continue
+            for i, price in zip(missing, results):
+                prices[i] = price
+                if price is not None and self.cache is not None:
+                    self.cache.set(price_cache_key(self.providers[i].name(), card_name), {"price": price})
+        return prices
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=len(self.groups) * FETCHES_PER_SOURCE, thread_name_prefix="price")
+            return self._pool.submit(fn, *args)
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        for provider in self.providers:
+            provider.close()
+
+    def _from_cache(self, i, card_name, prices):
+        if self.cache is None:
+            return False
+        with (self.stats or StageStats()).timer("price cache"):
+            cached = self.cache.get(price_cache_key(self.providers[i].name(), card_name))
+        with self._lock:
+            if cached is None:
+                self.misses += 1
+                return False
+            self.hits += 1
+        prices[i] = cached["price"]
+        return True
+
+    def _fetch_group(self, members, card_name):
+        with self._lock:
+            self.fetches += 1
+        listings = self.providers[members[0]].fetch_listings(card_name)
+        return [self.providers[i].price_from_listings(listings) for i in members]
+
+    def reset_stats(self):
+        with self._lock:
+            self.fetches = self.hits = self.misses = self.timeouts = 0
+        for provider in self.providers:
+            provider.reset_stats()
+
+    def attach_stats(self, stats):
+        self.stats = stats
+        for provider in self.providers:
+            provider.attach_stats(stats)
+
+    def attach_limiter(self, limiter):
+        self.limiter = limiter
+        for provider in self.providers:
+            provider.attach_limiter(limiter)
+
+    def summary_lines(self):
+        lines = [f"{len(self.providers)} price strategies from {len(self.groups)} sources: "
+                 f"{self.fetches} fetches, {self.timeouts} timed out"]
+        if self.cache is not None:
+            lookups = self.hits + self.misses
+            rate = 100 * self.hits / lookups if lookups else 0.0
+            lines.append(f"Price cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)")
+        for provider in self.providers:
+            lines.extend(provider.summary_lines())
+        return lines
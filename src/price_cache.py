@@ -0,0 +1,86 @@
+# price_cache.py
+import threading
+from pathlib import Path
+
+from price_providers import PriceProvider, normalize_search_term
+from sqlite_cache import SqliteCache
+from stage_stats import StageStats
+
+PRICE_CACHE_FILE = Path.home() / ".card_scanner_price_cache.sqlite"
+DEFAULT_TTL_HOURS = 24
+DEFAULT_MAX_ENTRIES = 50000
+
+
+def open_price_cache(ttl_hours=DEFAULT_TTL_HOURS, max_entries=DEFAULT_MAX_ENTRIES, path=PRICE_CACHE_FILE):
+    try:
+        return SqliteCache(path, ttl=ttl_hours * 3600, max_entries=max_entries)
+    except Exception as e:
+        print(f"Warning: price cache disabled ({e})")
+        return None
+
+
+def price_cache_key(provider_name, card_name):
+    return f"{provider_name}|{normalize_search_term(card_name)}"
+
+
+class CachedPriceProvider(PriceProvider):
+    """
+    Wraps any PriceProvider with a persistent cache.
+
+    Entries are keyed by the wrapped provider's name and the normalized
+    search term. Failed lookups (None) are not cached, so they are retried
+    on the next run.
+    """
+
+    def __init__(self, provider: PriceProvider, cache: SqliteCache):
+        self.provider = provider
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def name(self):
+        return self.provider.name()
+
+    def cache_key(self, card_name):
+        return price_cache_key(self.provider.name(), card_name)
+
+    def fetch_price(self, card_name: str) -> float:
+        key = self.cache_key(card_name)
+        with (self.stats or StageStats()).timer("price cache"):
+            cached = self.cache.get(key)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return cached["price"]
+
+        with self._lock:
+            self.misses += 1
+        price = self.provider.fetch_price(card_name)
+        if price is not None:
+            self.cache.set(key, {"price": price})
+        return price
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+        self.provider.reset_stats()
+
+    def attach_stats(self, stats):
+        self.stats = stats
+        self.provider.attach_stats(stats)
+
+    def attach_limiter(self, limiter):
+        self.limiter = limiter
+        self.provider.attach_limiter(limiter)
+
+    def close(self):
+        self.provider.close()
+
+    def summary_lines(self):
+        lookups = self.hits + self.misses
+        rate = 100 * self.hits / lookups if lookups else 0.0
+        return [
+            f"Price cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)"
+        ] + self.provider.summary_lines()
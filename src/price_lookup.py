@@ -1,9 +1,37 @@
-# price_lookup.py
 import csv
-import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def update_csv_with_prices(csv_path: Path, provider, column):
+from http_utils import TokenBucket
+from price_providers import normalize_search_term
+from profiling import Profiler, PROFILE_SUFFIX
+from stage_stats import StageStats
+
+DEFAULT_WORKERS = 4
+DEFAULT_RATE_LIMIT = 1.0  # requests per second
+
+def update_csv_with_prices(csv_path: Path, provider, column, workers=DEFAULT_WORKERS, rate_limit=DEFAULT_RATE_LIMIT, summary=None, job=None, profile=False):
+    """
+    Appends a price column to a copy of the CSV (one per strategy for a
+    provider with several `price_names`, e.g. a PriceAggregator).
+
+    Search terms are normalized (case, punctuation, whitespace) and each
+    unique term is looked up once; duplicate rows share the same pending
+    lookup. Lookups run on up to `workers` threads, throttled to
+    `rate_limit` network requests per second (providers wait on the
+    limiter just before going to the network, so cache hits are never
+    throttled). Rows are written in input order.
+    If a `summary` dict is passed it is filled with the run counts.
+
+    Progress is reported to `job` (a JobController) per unique term. A
+    cancelled job stops starting new lookups; every row is still written,
+    with an empty price where the lookup never ran.
+
+    Time spent waiting on the rate limit, in HTTP, parsing and the price
+    cache is reported with p50/p95 and saved to <output name>_stats.json.
+    With `profile`, the lookups run under cProfile and the profile is
+    saved next to the output CSV.
+    """
     output_path = csv_path.with_name(csv_path.stem + "_with_prices.csv")
 
     with open(csv_path, newline="", encoding="utf-8") as infile:
@@ -15,22 +43,85 @@ def update_csv_with_prices(csv_path: Path, provider, column):
             return csv_path
 
         search_index = header.index(column)
+        rows = list(reader)
+
+    limiter = TokenBucket(rate_limit)
+    provider.reset_stats()
+    stats = StageStats()
+    provider.attach_stats(stats)
+    provider.attach_limiter(limiter)
+    profiler = Profiler(profile)
+    price_names = provider.price_names()
+    not_found = ["N/A"] * len(price_names)
+
+    def lookup(search_term):
+        if job is not None and not job.proceed():
+            return [""] * len(price_names)
+        with profiler.active(), stats.timer("lookup"):
+            prices = provider.fetch_prices(search_term)
+        if all(price is None for price in prices):
+            stats.count("no price found")
+        if len(prices) == 1:
+            print(f"{search_term} → ${prices[0] if prices[0] is not None else 'N/A'}")
+        else:
+            print(f"{search_term} → " + ", ".join(f"{name}: ${price if price is not None else 'N/A'}"
+                                                   for name, price in zip(price_names, prices)))
+        if job is not None:
+            job.advance()
+        return [price if price is not None else "N/A" for price in prices]
+
+    if job is not None:
+        job.start(len({key for key in (normalize_search_term(row[search_index]) for row in rows) if key}))
+    # Leaving the block waits for the lookups, then closes the provider
+    # (e.g. a PriceAggregator's fetch pool)
+    with provider, ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        lookups = {}  # normalized term -> Future, shared by every row with that term
+        pending = []
+        for row in rows:
+            key = normalize_search_term(row[search_index])
+            if key and key not in lookups:
+                lookups[key] = pool.submit(lookup, row[search_index])
+            pending.append((row, lookups.get(key)))
 
         with open(output_path, "w", newline="", encoding="utf-8") as outfile:
             writer = csv.writer(outfile)
-            header.append(f"Price ({provider.name()})")
+            header.extend(f"Price ({name})" for name in price_names)
             writer.writerow(header)
 
-            for row in reader:
-                search_term = row[search_index]
-                if search_term:
-                    price = provider.fetch_price(search_term)
-                    print(f"{search_term} → ${price if price is not None else 'N/A'}")
-                    row.append(price if price is not None else "N/A")
-                else:
-                    row.append("N/A")
-                writer.writerow(row)
-                time.sleep(2)
+            for row, future in pending:
+                row.extend(future.result() if future else not_found)
+                with stats.timer("csv"):
+                    writer.writerow(row)
+    if job is not None:
+        job.finish()
+    provider.attach_stats(None)
+    provider.attach_limiter(None)
+
+    cancelled = job is not None and job.cancelled
+    unpriced = sum(1 for _, future in pending if future and future.result()[0] == "")
+    if cancelled:
+        print(f"Price lookup cancelled: {unpriced} rows left without a price")
+    searched = sum(1 for _, future in pending if future)
+    print(f"{len(rows)} rows, {len(lookups)} unique search terms, {searched - len(lookups)} network calls saved by deduplication")
+    counts = {
+        "rows": len(rows),
+        "unique_terms": len(lookups),
+        "calls_saved": searched - len(lookups),
+        "priced": sum(1 for _, future in pending if future and any(price not in ("N/A", "") for price in future.result())),
+        "cancelled": cancelled,
+        "unpriced": unpriced,
+    }
+    stats_path = stats.save_json(output_path.with_name(output_path.stem + "_stats.json"), provider=provider.name(), **counts)
+    profile_path = profiler.save(output_path.with_suffix(PROFILE_SUFFIX))
+    if summary is not None:
+        summary.update(counts, stats_path=str(stats_path), stages=stats.stages())
+        if profile_path:
+            summary["profile_path"] = str(profile_path)
+    for line in provider.summary_lines() + stats.report(label="rows", processed=len(rows)):
+        print(line)
+    print(f"Lookup timings saved to {stats_path.name}")
+    if profile_path:
+        print(f"Profile saved to {profile_path.name} (python -m pstats {profile_path.name})")
 
     return output_path
 
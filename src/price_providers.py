@@ -1,7 +1,22 @@
 # price_providers.py
+import re
+import unicodedata
 from abc import ABC, abstractmethod
 
+from stage_stats import StageStats
+
+def normalize_search_term(term: str) -> str:
+    # Case, punctuation and spacing differences don't change the search results
+    term = unicodedata.normalize("NFKC", term).casefold()
+    term = re.sub(r"[^\w\s]", " ", term)
+    return " ".join(term.split())
+
 class PriceProvider(ABC):
+    # StageStats that lookups time their HTTP, parsing and caching into, if any
+    stats = None
+    # TokenBucket that network requests wait on, if any; cache hits never do
+    limiter = None
+
     @abstractmethod
     def name(self):
         pass
@@ -9,3 +24,60 @@ class PriceProvider(ABC):
     @abstractmethod
     def fetch_price(self, card_name: str) -> float:
         pass
+
+    def price_names(self):
+        """Names of the prices `fetch_prices` returns, one CSV column each."""
+        return [self.name()]
+
+    def fetch_prices(self, card_name: str) -> list:
+        return [self.fetch_price(card_name)]
+
+    def reset_stats(self):
+        pass
+
+    def attach_stats(self, stats):
+        self.stats = stats
+
+    def attach_limiter(self, limiter):
+        self.limiter = limiter
+
+    def throttle(self):
+        """Waits for the attached rate limiter. Call right before each network request."""
+        if self.limiter is not None:
+            with (self.stats or StageStats()).timer("rate limit wait"):
+                self.limiter.acquire()
+
+    def summary_lines(self):
+        return []
+
+    def close(self):
+        """Releases threads or connections held between lookups. The provider can still be used afterwards."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ListingPriceProvider(PriceProvider):
+    """
+    A pricing strategy over scraped listings. Providers with the same
+    `listing_source` can share one `fetch_listings` call and each apply
+    `price_from_listings` to the result (see price_aggregator.py).
+    """
+
+    @abstractmethod
+    def listing_source(self):
+        """Hashable id of the listings `fetch_listings` returns."""
+
+    @abstractmethod
+    def fetch_listings(self, card_name: str):
+        pass
+
+    @abstractmethod
+    def price_from_listings(self, listings) -> float:
+        pass
+
+    def fetch_price(self, card_name: str) -> float:
+        return self.price_from_listings(self.fetch_listings(card_name))
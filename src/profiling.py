@@ -0,0 +1,98 @@
+# profiling.py
+import cProfile
+import pstats
+import sys
+import threading
+from contextlib import contextmanager
+
+PROFILE_SUFFIX = ".prof"
+# Since 3.12 cProfile hooks sys.monitoring, which is process-wide: one
+# enabled Profile sees every thread, and a second one cannot be enabled
+PROCESS_WIDE = sys.version_info >= (3, 12)
+
+
+class Profiler:
+    """
+    Opt-in cProfile capture that works across threads.
+
+    `active()` profiles the block, and may be entered from any number of
+    threads at once. Before Python 3.12 every thread gets its own
+    cProfile.Profile and `save` merges them. From 3.12 on there is one
+    shared Profile, enabled while any thread is inside `active()`. The
+    result is one pstats file (view it with `python -m pstats FILE` or
+    snakeviz). OCR worker processes are not included; their time shows up
+    in the stage timers. When disabled, or when another profiler or
+    debugger already holds the hook, `active()` does nothing.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._local = threading.local()
+        self._profiles = []
+        self._lock = threading.Lock()
+        self._active = 0  # threads inside active(), PROCESS_WIDE only
+        self._shared = None
+
+    @contextmanager
+    def active(self):
+        if not self.enabled or getattr(self._local, "depth", 0):
+            yield
+            return
+        self._local.depth = 1
+        try:
+            if PROCESS_WIDE:
+                with self._shared_profile():
+                    yield
+            else:
+                with self._thread_profile():
+                    yield
+        finally:
+            self._local.depth = 0
+
+    @contextmanager
+    def _thread_profile(self):
+        profile = getattr(self._local, "profile", None)
+        if profile is None:
+            profile = self._local.profile = cProfile.Profile()
+            with self._lock:
+                self._profiles.append(profile)
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+
+    @contextmanager
+    def _shared_profile(self):
+        with self._lock:
+            if self._active == 0 and self.enabled:
+                profile = self._shared or cProfile.Profile()
+                try:
+                    profile.enable()
+                except ValueError as e:
+                    print(f"Warning: profiling disabled ({e})")
+                    self.enabled = False
+                else:
+                    if self._shared is None:
+                        self._shared = profile
+                        self._profiles.append(profile)
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active -= 1
+                if self._active == 0 and self.enabled:
+                    self._shared.disable()
+
+    def save(self, path):
+        """Writes the merged profile to `path`; returns it, or None if nothing was profiled."""
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(path)
+        return path
@@ -1,14 +1,101 @@
 # region_selector.py (updated with fuzzy match dropdown)
 import tkinter as tk
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk
 from PIL import Image, ImageTk
 from pathlib import Path
 
-FUZZY_OPTIONS = ["No Fuzzy Matching", "Pokemon Name", "YuGiOh Card Name", "MTG Card Name"]
+from card_alignment import align_display_image
+from image_loader import load_display_image
+from region_template import FUZZY_OPTIONS
+
+# Decoded images kept in memory: the current one and its prefetched neighbours
+MAX_CACHED_IMAGES = 5
+# Rendered (image, zoom) PhotoImages kept for quick back-and-forth zooming
+MAX_RENDERED = 4
+# Pyramid levels stop halving below this long side
+MIN_LEVEL_SIDE = 256
+
+
+def build_pyramid(img):
+    """[(scale, image), ...] from full size down, each level half the previous."""
+    levels = [(1.0, img)]
+    while max(levels[-1][1].size) // 2 >= MIN_LEVEL_SIDE:
+        scale, level = levels[-1]
+        levels.append((scale / 2, level.reduce(2)))
+    return levels
+
+
+class DisplayImageCache:
+    """
+    Decoded display images for the selector, with a pyramid of halved
+    levels per image so any zoom is resized from the nearest larger level
+    instead of the full-size photo.
+
+    Images are decoded (and aligned) on a background thread. Least recently
+    used images beyond `max_images` are evicted, and the last few rendered
+    zoom levels are kept as Tk images. Only call from the Tk thread; the
+    PhotoImages are created here, the PIL work happens on the worker.
+    """
+
+    def __init__(self, image_paths, align=False, max_images=MAX_CACHED_IMAGES, max_rendered=MAX_RENDERED):
+        self.image_paths = image_paths
+        self.align = align
+        self.max_images = max(1, max_images)
+        self.max_rendered = max(1, max_rendered)
+        self._pyramids = OrderedDict()  # index -> Future of build_pyramid()
+        self._rendered = OrderedDict()  # (index, zoom) -> PhotoImage
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+
+    def _load(self, index):
+        img = load_display_image(self.image_paths[index])
+        if self.align:
+            img = align_display_image(img)
+        return build_pyramid(img)
+
+    def prefetch(self, index):
+        if 0 <= index < len(self.image_paths) and index not in self._pyramids:
+            self._pyramids[index] = self._pool.submit(self._load, index)
+            self._evict(keep=index)
+
+    def _evict(self, keep):
+        while len(self._pyramids) > self.max_images:
+            oldest = next(i for i in self._pyramids if i != keep)
+            self._pyramids.pop(oldest).cancel()
+            for key in [key for key in self._rendered if key[0] == oldest]:
+                del self._rendered[key]
+
+    def render(self, index, zoom):
+        """PhotoImage of image `index` at `zoom`."""
+        key = (index, zoom)
+        if key in self._rendered:
+            self._rendered.move_to_end(key)
+            return self._rendered[key]
+        self.prefetch(index)
+        self._pyramids.move_to_end(index)
+        levels = self._pyramids[index].result()
+        full = levels[0][1]
+        size = (max(1, int(full.width * zoom)), max(1, int(full.height * zoom)))
+        # Smallest level that is still at least as large as the target
+        level = next((level for scale, level in reversed(levels) if scale >= zoom), full)
+        # Never more than a 2x reduction from the level, so bilinear is enough
+        photo = ImageTk.PhotoImage(level if level.size == size else level.resize(size, Image.BILINEAR))
+        self._rendered[key] = photo
+        while len(self._rendered) > self.max_rendered:
+            self._rendered.popitem(last=False)
+        return photo
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
 
 class RegionSelector:
-    def __init__(self, image_paths):
+    def __init__(self, image_paths, align=False):
         self.image_paths = image_paths
+        # Show each card straightened into the canonical frame, so boxes
+        # are drawn in the coordinates the aligned scan uses
+        self.align = align
         self.index = 0
         self.capture_boxes = []
         self.current_box_index = None
@@ -17,6 +104,9 @@ class RegionSelector:
         self.start_x = None
         self.start_y = None
         self.zoom = 1.0
+        self.images = DisplayImageCache(image_paths, align=align)
+        self.image_item = None
+        self._shown = (None, None)  # (index, zoom) on the canvas
 
         self.root = tk.Toplevel()
         self.root.title("Select OCR Regions")
@@ -74,6 +164,7 @@ class RegionSelector:
 
         self.load_image()
         self.root.wait_window()
+        self.images.close()
 
     def add_capture_box(self):
         idx = len(self.capture_boxes)
@@ -101,7 +192,7 @@ class RegionSelector:
         if index is not None:
             self.selected_box_index.set(index)
         self.current_box_index = self.selected_box_index.get()
-        self.load_image()
+        self.draw_boxes()
 
     def show_prev_image(self):
         if self.index > 0:
@@ -114,18 +205,42 @@ class RegionSelector:
             self.load_image()
 
     def load_image(self):
-        image_path = self.image_paths[self.index]
-        self.img = Image.open(image_path)
-        self.zoomed_img = self.img.resize((int(self.img.width * self.zoom), int(self.img.height * self.zoom)))
-        self.tk_img = ImageTk.PhotoImage(self.zoomed_img)
-        self.canvas.delete("all")
-        self.canvas.create_image(0, 0, anchor="nw", image=self.tk_img)
-        self.canvas.config(scrollregion=self.canvas.bbox("all"))
+        # The canvas image is only swapped when the image or zoom changes;
+        # box edits move their own rectangle items (see update_box)
+        if self._shown != (self.index, self.zoom):
+            photo = self.images.render(self.index, self.zoom)
+            if self.image_item is None:
+                self.image_item = self.canvas.create_image(0, 0, anchor="nw", image=photo)
+            else:
+                self.canvas.itemconfig(self.image_item, image=photo)
+            self.tk_img = photo
+            self.canvas.config(scrollregion=(0, 0, photo.width(), photo.height()))
+            self._shown = (self.index, self.zoom)
+            # Neighbours decode in the background so < and > are instant
+            self.images.prefetch(self.index + 1)
+            self.images.prefetch(self.index - 1)
+        self.draw_boxes()
+
+    def draw_boxes(self):
+        self.canvas.delete("box")
         for i, box in enumerate(self.capture_boxes):
+            box["item"] = None
             if box["coords"]:
-                x1, y1, x2, y2 = [int(c * self.zoom) for c in box["coords"]]
-                color = 'blue' if i == self.selected_box_index.get() else 'red'
-                self.canvas.create_rectangle(x1, y1, x2, y2, outline=color, width=2 if color == 'blue' else 1)
+                box["item"] = self.canvas.create_rectangle(*self.box_canvas_coords(box), tags="box", **self.box_style(i))
+
+    def box_canvas_coords(self, box):
+        return [int(c * self.zoom) for c in box["coords"]]
+
+    def box_style(self, i):
+        selected = i == self.selected_box_index.get()
+        return {"outline": "blue" if selected else "red", "width": 2 if selected else 1}
+
+    def update_box(self, i):
+        box = self.capture_boxes[i]
+        if box.get("item") is None:
+            box["item"] = self.canvas.create_rectangle(*self.box_canvas_coords(box), tags="box", **self.box_style(i))
+        else:
+            self.canvas.coords(box["item"], *self.box_canvas_coords(box))
 
     def on_click(self, event):
         if self.current_box_index is None:
@@ -144,7 +259,7 @@ class RegionSelector:
         w, h = abs(x2 - x1), abs(y2 - y1)
         self.capture_boxes[self.current_box_index]["coords"] = coords
         self.capture_boxes[self.current_box_index]["label"].config(text=f"[x:{x1} y:{y1} w:{w} h:{h}]")
-        self.load_image()
+        self.update_box(self.current_box_index)
 
     def on_release(self, event):
         pass
@@ -0,0 +1,74 @@
+# region_template.py
+import json
+from pathlib import Path
+
+from card_alignment import to_card_fractions, from_card_fractions
+
+FUZZY_OPTIONS = ["No Fuzzy Matching", "Pokemon Name", "YuGiOh Card Name", "MTG Card Name"]
+NO_FUZZY = FUZZY_OPTIONS[0]
+
+TEMPLATE_FILENAME = "capture_template.json"
+
+# Coordinate frames: pixels of the sample image, or fractions of the
+# aligned card (see card_alignment.py)
+FRAME_IMAGE = "image"
+FRAME_CARD = "card"
+
+
+def save_template(path: Path, capture_data, region_preprocess=None, aligned=False):
+    """
+    Saves capture regions as produced by RegionSelector.get_capture_data()
+    so the same scan can be repeated headlessly (see cli.py). Regions with
+    an entry in `region_preprocess` also store their preprocessing steps.
+    With `aligned`, coords are canonical card pixels and are stored as
+    fractions of the card so they apply to any photo of it.
+    """
+    region_preprocess = region_preprocess or {}
+    regions = []
+    for name, coords, fuzzy in capture_data:
+        coords = to_card_fractions(coords) if aligned else list(coords)
+        region = {"name": name, "coords": coords, "fuzzy_type": fuzzy}
+        if name in region_preprocess:
+            region["preprocess"] = region_preprocess[name]
+        regions.append(region)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "frame": FRAME_CARD if aligned else FRAME_IMAGE, "regions": regions}, f, indent=2)
+
+
+def load_template(path: Path):
+    """
+    Returns capture data as a list of (name, coords, fuzzy_type) tuples.
+    Coords of card-frame templates come back as canonical card pixels.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    capture_data = []
+    for region in data.get("regions", []):
+        coords = region["coords"]
+        if len(coords) != 4:
+            raise ValueError(f"Region {region.get('name')!r} needs 4 coordinates, got {len(coords)}")
+        if data.get("frame", FRAME_IMAGE) == FRAME_CARD:
+            coords = from_card_fractions(float(c) for c in coords)
+        coords = tuple(int(c) for c in coords)
+        fuzzy = region.get("fuzzy_type", NO_FUZZY)
+        if fuzzy not in FUZZY_OPTIONS:
+            raise ValueError(f"Region {region.get('name')!r} has unknown fuzzy type {fuzzy!r}")
+        capture_data.append((region["name"], coords, fuzzy))
+
+    if not capture_data:
+        raise ValueError(f"No regions defined in {path}")
+    return capture_data
+
+
+def load_region_preprocess(path: Path):
+    """Returns {region name: preprocessing preset or steps} for regions that set one."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return {region["name"]: region["preprocess"] for region in data.get("regions", []) if "preprocess" in region}
+
+
+def load_template_frame(path: Path):
+    """FRAME_CARD when the template's boxes are relative to the aligned card, else FRAME_IMAGE."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("frame", FRAME_IMAGE)
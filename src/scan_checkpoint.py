@@ -0,0 +1,98 @@
+# scan_checkpoint.py
+import hashlib
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+
+MANIFEST_FILENAME = "scan_manifest.jsonl"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def template_fingerprint(capture_data, ocr_settings=()) -> str:
+    # Results are only reusable when the same regions were captured and
+    # OCR'd the same way (decode frame, preprocessing, tesseract settings)
+    regions = [[name, list(coords), fuzzy] for name, coords, fuzzy in capture_data]
+    return hashlib.sha256(json.dumps([regions, list(ocr_settings)]).encode("utf-8")).hexdigest()[:16]
+
+
+class ScanManifest:
+    """
+    Append-only checkpoint of processed images, stored as JSON lines in
+    the output folder.
+
+    Each line records an image's content hash, the capture template and
+    OCR settings it was scanned with (`ocr_settings`, the same strings
+    that go into OCR cache keys), its CSV entry and output path. A restarted scan (or a
+    nightly run over a growing folder) skips images whose hash is already
+    recorded for the same template and whose output file still exists.
+
+    Only records from earlier runs (loaded at startup) are looked up. An
+    image recorded during this run is never "resumed" by a byte-identical
+    copy later in the same batch; that copy is scanned (and caught by
+    duplicate detection, when it is on).
+
+    Byte-identical inputs each have their own record, keyed by hash and
+    input path. An image whose path has no record only takes over another
+    record with its hash when that record's input is gone (the file was
+    renamed or moved), and each record is handed out once per run, so two
+    inputs never share one output file.
+    """
+
+    def __init__(self, out_dir: Path, capture_data, ocr_settings=()):
+        self.path = out_dir / MANIFEST_FILENAME
+        self.template = template_fingerprint(capture_data, ocr_settings)
+        self.records = {}  # hash -> {input path: record}
+        self._lock = threading.Lock()
+
+        if self.path.exists():
+            self._load()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # partial line left by an interrupted write
+                if record.get("template") == self.template:
+                    self.records.setdefault(record["hash"], {})[record.get("input_path")] = record
+
+    def lookup(self, digest, input_path):
+        """Returns the finished entry for an image, or None if it needs scanning."""
+        candidates = self.records.get(digest)
+        if not candidates:
+            return None
+        key = str(input_path)
+        if key not in candidates:
+            key = next((path for path in candidates if not path or not Path(path).exists()), None)
+        record = candidates.pop(key, None)
+        if record and Path(record["output_path"]).exists():
+            return record["entry"]
+        return None
+
+    def record(self, digest, entry):
+        # Appended to the file for the next run only; see the class docstring
+        record = {
+            "hash": digest,
+            "template": self.template,
+            "input_path": entry.get("input_path"),
+            "output_path": entry.get("output_path"),
+            "entry": entry,
+            "scanned_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with self._lock:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
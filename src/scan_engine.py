@@ -0,0 +1,146 @@
+# scan_engine.py
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from card_alignment import align_card, ALIGN_MIN_SIDE
+from image_loader import load_gray, load_regions, region_views
+from ocr_backends import get_ocr_backend, ocr_config_key
+from preprocess import preprocess
+from stage_stats import StageStats
+
+# How crops are decoded before the preprocessing steps (part of the OCR cache key)
+DECODE = "draft-gray"
+
+
+def init_worker(backend_name):
+    # Ctrl+C reaches the whole process group; the parent decides whether
+    # that cancels the scan, and workers finish the jobs already queued
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Load the OCR engine once when the worker starts, not on its first job
+    get_ocr_backend(backend_name)
+
+
+def ocr_image_regions(img_path, boxes, backend_name="auto", reduction=1, steps=None, align=False):
+    """
+    Worker job: decode one image, preprocess and OCR each capture box.
+
+    The image is decoded once to grayscale (at 1/`reduction` size for
+    JPEGs) and each box is cut as a view into that buffer, then run
+    through its preprocessing steps (`steps[i]` for `boxes[i]`). With
+    `align`, the card is first warped to the canonical frame and `boxes`
+    are in that frame's pixels.
+
+    Returns (texts, timings) where texts follows the order of `boxes`
+    and timings maps stage name to [seconds, items] for this job.
+    """
+    timings = {}
+    steps = steps or [()] * len(boxes)
+
+    start = time.perf_counter()
+    if not align:
+        crops = load_regions(img_path, boxes, reduction)
+        timings["decode"] = [time.perf_counter() - start, 1]
+    else:
+        pixels, _ = load_gray(img_path, min_side=ALIGN_MIN_SIDE)
+        timings["decode"] = [time.perf_counter() - start, 1]
+        start = time.perf_counter()
+        card, found = align_card(pixels)
+        timings["align"] = [time.perf_counter() - start, 1]
+        if not found:
+            timings["align (no card outline)"] = [0.0, 1]
+        crops = region_views(card, 1.0, boxes)
+
+    crops = [preprocess(crop, region_steps, timings) for crop, region_steps in zip(crops, steps)]
+
+    start = time.perf_counter()
+    backend = get_ocr_backend(backend_name)
+    texts = [backend.image_to_string(crop).strip() if crop.size else "" for crop in crops]
+    timings["ocr"] = [time.perf_counter() - start, len(boxes)]
+
+    return texts, timings
+
+
+# Jobs kept in flight per worker; bounds memory however many images there are
+JOBS_PER_WORKER = 2
+
+
+class ScanEngine:
+    """
+    Fans OCR work for a scan out to a pool of worker processes.
+
+    Each image is one job (decoded once, all capture boxes OCR'd in the
+    same worker). `submit` starts a job and returns a future; `collect`
+    waits for it and returns the texts. Callers keep at most
+    `max_in_flight` jobs pending so memory stays bounded, and collect them
+    in input order to keep their naming and CSV logic sequential. The
+    worker processes start on the first job and stop on `close()` (or
+    leaving a `with` block).
+    """
+
+    def __init__(self, workers=None, backend="auto", stats=None):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.backend = backend
+        self.stats = stats or StageStats()
+        self.max_in_flight = self.workers * JOBS_PER_WORKER
+        self._pool = None
+
+    def ocr_config(self):
+        return ocr_config_key(self.backend)
+
+    def submit(self, img_path, boxes, steps=None, reduction=1, align=False):
+        """
+        Starts OCR of `boxes` in one image and returns a Future for
+        `collect`. `steps[i]` preprocesses `boxes[i]`, `reduction` is the
+        JPEG decode reduction (see image_loader) and `align` warps the card
+        to the canonical frame first. With a single worker the job runs
+        right here and the future is already done.
+        """
+        if self.workers == 1:
+            future = Future()
+            future.set_result(ocr_image_regions(img_path, boxes, self.backend, reduction, steps, align))
+            return future
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_worker,
+                initargs=(self.backend,),
+            )
+        return self._pool.submit(ocr_image_regions, img_path, boxes, self.backend, reduction, steps, align)
+
+    def collect(self, future):
+        """Waits for a submitted job and returns its texts, in the order of its boxes."""
+        texts, timings = future.result()
+        for stage, (seconds, items) in timings.items():
+            self.stats.add(stage, seconds, items)
+        return texts
+
+    def ocr_images(self, image_paths, boxes, reduction=1, steps=None, align=False):
+        """Yields (img_path, texts) for every image, in the order given."""
+        boxes = tuple(tuple(box) for box in boxes)
+        pending = deque()
+        try:
+            for img_path in image_paths:
+                pending.append((img_path, self.submit(img_path, boxes, steps, reduction, align)))
+                if len(pending) >= self.max_in_flight:
+                    img_path, future = pending.popleft()
+                    yield img_path, self.collect(future)
+            while pending:
+                img_path, future = pending.popleft()
+                yield img_path, self.collect(future)
+        finally:
+            self.close()
+
+    def close(self):
+        """Stops the worker processes; jobs not started yet are dropped."""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,442 @@
+# scan_pipeline.py
+from collections import deque, namedtuple
+from datetime import datetime
+from pathlib import Path
+
+from card_alignment import CARD_SIZE, HAS_CV2
+from csv_logger import CardSummaryWriter, summary_columns
+from fuzzy_utils import load_card_index, fuzzy_match_name, batch_fuzzy_match, BATCH_CHUNK_ROWS
+from image_loader import normalize_box, draft_reduction
+from ocr_cache import ocr_cache_key, cache_summary, cache_summary_line
+from ocr_utils import sanitize_card_name
+from output_writer import OutputWriter
+from profiling import Profiler, PROFILE_SUFFIX
+from phash_index import PHashIndex, FolderHashes, phash, DEFAULT_MAX_DISTANCE, DUPLICATE_MODES
+from preprocess import region_steps, steps_key, DEFAULT_PRESET
+from region_template import NO_FUZZY
+from scan_checkpoint import ScanManifest, file_digest
+from scan_engine import ScanEngine, DECODE
+from session_logger import start_log
+
+IMAGE_PATTERNS = ["*.jpg", "*.png"]
+
+DUPLICATE_COLUMN = "Duplicate Of"
+
+
+class ScanRecord(namedtuple("ScanRecord", ["idx", "img_path", "entry", "digest", "resumed", "phash", "duplicate_of", "skipped"],
+                            defaults=[None, None, False])):
+    """
+    One image moving through the pipeline. `resumed` is True when its entry
+    came from the checkpoint manifest instead of being scanned in this run;
+    `skipped` when it is a near-duplicate and duplicates are skipped.
+    """
+    __slots__ = ()
+
+    @property
+    def done(self):
+        # Nothing left to OCR, match or copy
+        return self.resumed or self.skipped
+
+
+def find_images(in_dir: Path):
+    images = []
+    for pattern in IMAGE_PATTERNS:
+        images.extend(in_dir.glob(pattern))
+    return images
+
+
+def load_fuzzy_indexes(capture_data, stats):
+    fuzzy_cache = {}
+    for _, _, fuzzy in capture_data:
+        if fuzzy != NO_FUZZY and fuzzy not in fuzzy_cache:
+            try:
+                with stats.timer("fuzzy index load"):
+                    fuzzy_cache[fuzzy] = load_card_index(fuzzy)
+            except Exception as e:
+                print(f"Warning: failed to load fuzzy list for {fuzzy}: {e}")
+                fuzzy_cache[fuzzy] = None
+    return fuzzy_cache
+
+
+# Pipeline stages. Each one consumes and yields ScanRecords one image at a
+# time, so memory stays flat however big the scan is.
+
+def checkpoint_stage(images, manifest, stats, need_digest=False, job=None):
+    for idx, img_path in enumerate(images, start=1):
+        # Pausing or cancelling only holds back new images; the ones
+        # already in flight still go all the way through to the CSV
+        if job is not None and not job.proceed():
+            return
+        digest, entry = None, None
+        if manifest or need_digest:
+            with stats.timer("hash"):
+                digest = file_digest(img_path)
+        if manifest:
+            entry = manifest.lookup(digest, img_path)
+            if entry is not None:
+                entry = dict(entry, input_path=str(img_path))
+        yield ScanRecord(idx, img_path, entry, digest, entry is not None)
+
+
+def dedup_stage(records, folder_hashes, mode, stats, max_distance=DEFAULT_MAX_DISTANCE):
+    # Compares each new image with the output images/ folder and with the
+    # earlier images of this batch. Duplicates are flagged, or with
+    # mode "skip" passed through without OCR.
+    # Resumed images are not checked again (their entry is final), but
+    # their hashes are registered so later copies in the batch match them.
+    batch = PHashIndex()
+    for record in records:
+        try:
+            with stats.timer("phash"):
+                value = phash(record.img_path)
+        except Exception as e:
+            print(f"Warning: could not hash {record.img_path.name}: {e}")
+            value = None
+        if value is None:
+            yield record
+            continue
+        if record.resumed:
+            batch.add(str(record.img_path), value)
+            yield record
+            continue
+
+        with stats.timer("duplicate lookup"):
+            match = folder_hashes.index.nearest(value, max_distance)
+            if match:
+                duplicate_of = str(folder_hashes.images_dir / match[0])
+            else:
+                match = batch.nearest(value, max_distance)
+                duplicate_of = match[0] if match else None
+
+        if duplicate_of is None:
+            batch.add(str(record.img_path), value)
+            yield record._replace(phash=value)
+        elif mode == "skip":
+            entry = {"input_path": str(record.img_path), DUPLICATE_COLUMN: duplicate_of}
+            yield record._replace(entry=entry, phash=value, duplicate_of=duplicate_of, skipped=True)
+        else:
+            yield record._replace(phash=value, duplicate_of=duplicate_of)
+
+
+def ocr_settings(capture_data, steps, align):
+    """(boxes, decode reduction, per-box decode/preprocessing key) for a template."""
+    boxes = [normalize_box(coords) for _, coords, _ in capture_data]
+    # Decode scale is chosen from the whole template so a box's cached text
+    # never depends on which other boxes were OCR'd alongside it
+    reduction = draft_reduction(boxes)
+    frame = "card{}x{}".format(*CARD_SIZE) if align else reduction
+    return boxes, reduction, [f"{DECODE}/{frame}|{steps_key(region)}" for region in steps]
+
+
+def ocr_stage(engine, records, capture_data, steps, ocr_cache=None, align=False):
+    # Decode, preprocessing and OCR happen in the engine's worker processes.
+    # Resumed or skipped records and regions found in the OCR cache skip
+    # OCR but keep their place in the output order. Records are yielded as
+    # soon as everything ahead of them is done, so a run that needs no OCR
+    # still streams.
+    names = [name for name, _, _ in capture_data]
+    boxes, reduction, preprocessing = ocr_settings(capture_data, steps, align)
+    ocr_config = engine.ocr_config()
+    # (record, texts, indexes of boxes being OCR'd, cache keys, future or None)
+    queued = deque()
+    in_flight = 0
+
+    def finish(record, texts):
+        if record.done:
+            return record
+        entry = {"input_path": str(record.img_path)}
+        entry.update(zip(names, texts))
+        if record.duplicate_of:
+            entry[DUPLICATE_COLUMN] = record.duplicate_of
+        return record._replace(entry=entry)
+
+    def pop():
+        nonlocal in_flight
+        record, texts, missing, keys, future = queued.popleft()
+        if future is not None:
+            in_flight -= 1
+            for i, text in zip(missing, engine.collect(future)):
+                texts[i] = text
+                if keys:
+                    ocr_cache.set(keys[i], text)
+        return finish(record, texts)
+
+    def must_wait():
+        # Bounds the OCR jobs in flight and the finished records held back
+        # behind them
+        return in_flight >= engine.max_in_flight or len(queued) >= 2 * engine.max_in_flight
+
+    with engine:
+        for record in records:
+            texts, keys = [None] * len(boxes), None
+            if ocr_cache is not None and not record.done:
+                keys = [ocr_cache_key(record.digest, box, prep, ocr_config) for box, prep in zip(boxes, preprocessing)]
+                with engine.stats.timer("ocr cache", items=len(keys)):
+                    texts = [ocr_cache.get(key) for key in keys]
+            missing = [] if record.done else [i for i, text in enumerate(texts) if text is None]
+            future = None
+            if missing:
+                future = engine.submit(record.img_path, [boxes[i] for i in missing], [steps[i] for i in missing], reduction, align)
+                in_flight += 1
+            queued.append((record, texts, missing, keys, future))
+            while queued and (queued[0][4] is None or queued[0][4].done() or must_wait()):
+                yield pop()
+        while queued:
+            yield pop()
+
+
+def match_stage(records, capture_data, fuzzy_cache, stats, batch=False):
+    fuzzy_fields = [(name, fuzzy_cache[fuzzy]) for name, _, fuzzy in capture_data if fuzzy != NO_FUZZY]
+    if not fuzzy_fields:
+        yield from records
+        return
+
+    if not batch:
+        for record in records:
+            if record.done:
+                yield record
+                continue
+            entry = record.entry
+            for name, index in fuzzy_fields:
+                with stats.timer("fuzzy"):
+                    match = fuzzy_match_name(entry[name], index.names, index=index) if index else ""
+                entry[f"Fuzzy {name}"] = match
+            yield record
+        return
+
+    # Batch mode scores fixed-size chunks so the scan still streams
+    chunk = []
+    for record in records:
+        if record.done:
+            # Emit pending chunk first so output order is preserved
+            yield from match_batch(chunk, fuzzy_fields, stats)
+            chunk = []
+            yield record
+            continue
+        chunk.append(record)
+        if len(chunk) >= BATCH_CHUNK_ROWS:
+            yield from match_batch(chunk, fuzzy_fields, stats)
+            chunk = []
+    yield from match_batch(chunk, fuzzy_fields, stats)
+
+
+def match_batch(chunk, fuzzy_fields, stats):
+    # Match every OCR string of a field in the chunk in one vectorized pass
+    for name, index in fuzzy_fields:
+        texts = [record.entry[name] for record in chunk]
+        if not texts:
+            continue
+        with stats.timer("fuzzy", items=len(texts)):
+            matches = batch_fuzzy_match(texts, index.name_list()) if index else []
+        for i, record in enumerate(chunk):
+            record.entry[f"Fuzzy {name}"] = matches[i].match if matches else ""
+    return chunk
+
+
+def output_stage(records, output, primary_field):
+    # Renamed copies are written on the output writer's I/O threads while
+    # OCR carries on; records come out in order once their file exists
+    def transfers():
+        for record in records:
+            if record.done:
+                yield None, None, record
+                continue
+            card_name = record.entry.get(primary_field, "").strip()
+            safe_name = sanitize_card_name(card_name)
+            if not safe_name or safe_name.lower() == "unknowncard":
+                safe_name = f"SCAN_{record.idx}"
+            yield record.img_path, safe_name, record
+
+    for record, path in output.write_all(transfers()):
+        if path is not None:
+            record.entry["output_path"] = str(path)
+        yield record
+
+
+def write_stage(records, writer, manifest, folder_hashes, log_file, stats):
+    for record in records:
+        entry = record.entry
+        with stats.timer("csv"):
+            writer.write(entry)
+        if record.resumed:
+            log_file.write(f"[{record.img_path.name}] → already scanned as: {Path(entry['output_path']).name}\n")
+        elif record.skipped:
+            log_file.write(f"[{record.img_path.name}] → duplicate of {Path(record.duplicate_of).name}, skipped\n")
+        else:
+            if manifest:
+                manifest.record(record.digest, entry)
+            output_name = Path(entry["output_path"]).name
+            if folder_hashes is not None and record.phash is not None:
+                folder_hashes.add(output_name, record.phash)
+            note = f" (duplicate of {Path(record.duplicate_of).name})" if record.duplicate_of else ""
+            log_file.write(f"[{record.img_path.name}] → OCR → Saved as: {output_name}{note}\n")
+        log_file.flush()
+        yield record
+
+
+def run_scan(images, out_dir: Path, capture_data, workers=None, backend="auto", fuzzy_mode="indexed", progress=None, resume=True, ocr_cache=None,
+             preprocess=DEFAULT_PRESET, region_preprocess=None, align=False,
+             duplicates="off", duplicate_distance=DEFAULT_MAX_DISTANCE, output_mode="copy", job=None, profile=False):
+    """
+    OCRs every image, renames a copy into out_dir/images and writes the
+    summary CSV. No GUI dependencies, so it runs from the app or the CLI.
+
+    Images flow through the stages one at a time and each CSV row is
+    flushed as soon as its image is done, so a crash keeps everything
+    processed up to that point. With `resume`, images already recorded in
+    the output folder's checkpoint manifest (same content, same template)
+    are not scanned again; their previous entries are carried into the CSV.
+    Otherwise each region's text is looked up in `ocr_cache` (keyed by image
+    content, box and OCR settings) before it is sent to tesseract.
+
+    Args:
+        images (list of Path): Images to scan, in order.
+        out_dir (Path): Output folder for images/, the CSV and the scan log.
+        capture_data (list): (name, coords, fuzzy_type) per capture box.
+        progress (callable): Optional progress(done, total, img_path) callback.
+        resume (bool): Skip images finished by an earlier run.
+        ocr_cache (SqliteCache): Optional persistent OCR result cache.
+        preprocess: Preset name or list of steps applied to every crop
+            before OCR (see preprocess.py).
+        region_preprocess (dict): Per-region overrides of `preprocess`.
+        align (bool): Find and straighten the card in every photo first;
+            box coords are then pixels of the canonical card frame.
+        duplicates (str): "flag" or "skip" images whose perceptual hash is
+            within `duplicate_distance` bits of an image already in
+            out_dir/images or earlier in this batch; "off" to not check.
+        output_mode (str): How images get into out_dir/images: "copy",
+            "link" (hard link, else copy) or "move" (see output_writer.py).
+        job (JobController): Optional progress/pause/cancel control. A
+            cancelled scan stops taking new images; everything already
+            started is still written, so the output stays resumable.
+        profile (bool): Run the scan under cProfile and save the profile
+            next to the CSV (see profiling.py).
+
+    Stage timings (totals, p50/p95 per item) and counters go to the scan
+    log and to <csv name>_stats.json next to the CSV.
+
+    Returns:
+        dict: Run summary (counts, output paths, stage timings).
+    """
+    steps = region_steps(capture_data, preprocess, region_preprocess)
+    if align and not HAS_CV2:
+        raise ValueError("Card alignment needs OpenCV (pip install opencv-python)")
+    if duplicates not in DUPLICATE_MODES:
+        raise ValueError(f"Unknown duplicates mode: {duplicates}")
+    images_dir = out_dir / "images"
+    images_dir.mkdir(parents=True, exist_ok=True)
+
+    log_file = start_log(out_dir)
+    log_file.write(f"Scan started at {datetime.now()}\n")
+    if align:
+        log_file.write("Cards aligned to a {}x{} frame before capture\n".format(*CARD_SIZE))
+    for (name, coords, fuzzy), region in zip(capture_data, steps):
+        log_file.write(f"Capture: {name} = {coords} (fuzzy: {fuzzy}, preprocess: {steps_key(region)})\n")
+    log_file.write("\n")
+
+    engine = ScanEngine(workers=workers, backend=backend)
+    stats = engine.stats
+    fuzzy_cache = load_fuzzy_indexes(capture_data, stats)
+    columns = summary_columns(capture_data)
+    folder_hashes = None
+    if duplicates != "off":
+        columns.append(DUPLICATE_COLUMN)
+        with stats.timer("phash index load"):
+            folder_hashes = FolderHashes(images_dir)
+    writer = CardSummaryWriter(out_dir, columns)
+    output = OutputWriter(images_dir, output_mode, stats=stats)
+    manifest = None
+    if resume:
+        _, _, preprocessing = ocr_settings(capture_data, steps, align)
+        manifest = ScanManifest(out_dir, capture_data, preprocessing + [engine.ocr_config()])
+    resumed = duplicate_count = skipped = 0
+    if ocr_cache is not None:
+        ocr_cache.reset_stats()
+
+    print(f"Scanning {len(images)} images with {engine.workers} OCR workers ({engine.backend} backend)...")
+
+    profiler = Profiler(profile)
+    if job is not None:
+        job.start(len(images))
+    try:
+        records = checkpoint_stage(images, manifest, stats, need_digest=ocr_cache is not None, job=job)
+        if folder_hashes is not None:
+            records = dedup_stage(records, folder_hashes, duplicates, stats, duplicate_distance)
+        records = ocr_stage(engine, records, capture_data, steps, ocr_cache, align)
+        records = match_stage(records, capture_data, fuzzy_cache, stats, batch=fuzzy_mode == "batch")
+        records = output_stage(records, output, capture_data[0][0])
+        records = write_stage(records, writer, manifest, folder_hashes, log_file, stats)
+
+        with profiler.active():
+            for done, record in enumerate(records, start=1):
+                resumed += record.resumed
+                duplicate_count += record.duplicate_of is not None
+                skipped += record.skipped
+                if job is not None:
+                    job.advance()
+                if progress:
+                    progress(done, len(images), record.img_path)
+    finally:
+        if job is not None:
+            job.finish()
+        engine.close()
+        output.close()
+        writer.close()
+        if manifest:
+            manifest.close()
+        if folder_hashes is not None:
+            folder_hashes.save()
+
+    if resumed:
+        stats.count("resumed from manifest", resumed)
+    if duplicate_count:
+        stats.count("near-duplicates", duplicate_count)
+    cancelled = job is not None and job.cancelled
+    extra = {"ocr_cache": cache_summary(ocr_cache)} if ocr_cache is not None else {}
+    stats_path = stats.save_json(writer.path.with_name(writer.path.stem + "_stats.json"),
+                                 images=len(images), entries=writer.rows, cancelled=cancelled, **extra)
+    profile_path = profiler.save(writer.path.with_suffix(PROFILE_SUFFIX))
+
+    if cancelled:
+        print(f"Scan cancelled after {job.done} of {len(images)} images")
+    if resumed:
+        print(f"Skipped {resumed} images already scanned in a previous run")
+    if duplicate_count:
+        action = "skipped" if duplicates == "skip" else "flagged"
+        print(f"{duplicate_count} near-duplicate images {action} (see the {DUPLICATE_COLUMN!r} column)")
+
+    if cancelled:
+        log_file.write(f"\nScan cancelled. {job.done} of {len(images)} images processed.\n")
+    else:
+        log_file.write(f"\nScan complete. {len(images)} images processed.\n")
+    log_file.write(f"{writer.rows} entries recorded ({resumed} from previous runs, {duplicate_count} near-duplicates).\n")
+    lines = stats.report(label="images", processed=writer.rows)
+    if ocr_cache is not None:
+        lines.append(cache_summary_line(ocr_cache))
+    lines.append(f"Stage timings saved to {stats_path.name}")
+    if profile_path:
+        lines.append(f"Profile saved to {profile_path.name} (python -m pstats {profile_path.name})")
+    for line in lines:
+        print(line)
+        log_file.write(line + "\n")
+    log_file.close()
+
+    summary = {
+        "images": len(images),
+        "entries": writer.rows,
+        "resumed": resumed,
+        "duplicates": duplicate_count,
+        "skipped": skipped,
+        "cancelled": cancelled,
+        "output": output.summary(),
+        "csv_path": str(writer.path),
+        "log_path": log_file.name,
+        "stats_path": str(stats_path),
+        "elapsed_seconds": round(stats.elapsed(), 3),
+        "stages": stats.stages(),
+    }
+    if profile_path:
+        summary["profile_path"] = str(profile_path)
+    if ocr_cache is not None:
+        summary["ocr_cache"] = cache_summary(ocr_cache)
+    return summary
@@ -1,7 +1,7 @@
 # session_logger.py
 from datetime import datetime
 
-def start_log(output_dir: str):
+def start_log(output_dir: str, prefix="scan_log"):
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    log_path = output_dir / f"scan_log_{timestamp}.txt"
+    log_path = output_dir / f"{prefix}_{timestamp}.txt"
     return open(log_path, "w", encoding="utf-8")  # Caller is responsible for closing it
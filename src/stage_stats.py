@@ -0,0 +1,121 @@
+# stage_stats.py
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# Per-stage timings kept for percentiles; beyond this a uniform sample is kept
+MAX_SAMPLES = 10000
+
+
+def percentile(values, q):
+    """Nearest-rank percentile (0-100) of a sorted list."""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, round(q / 100 * len(values)) - 1))
+    return values[rank]
+
+
+class StageStats:
+    """
+    Accumulates time and item counts per named pipeline stage, plus
+    named counters.
+
+    Stages can be fed from worker results (`add`) or timed inline with
+    the `timer` context manager. Each call is also kept as a per-item
+    sample (up to MAX_SAMPLES per stage) for the p50/p95 in the report.
+    Safe to update from multiple threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._samples = {}
+        self._calls = {}
+        self._counters = {}
+        self._random = random.Random(0)
+        self._started = time.perf_counter()
+
+    def add(self, stage, seconds, items=1):
+        per_item = seconds / items if items else seconds
+        with self._lock:
+            total, count = self._stages.get(stage, (0.0, 0))
+            self._stages[stage] = (total + seconds, count + items)
+            calls = self._calls[stage] = self._calls.get(stage, 0) + 1
+            samples = self._samples.setdefault(stage, [])
+            if len(samples) < MAX_SAMPLES:
+                samples.append(per_item)
+            else:
+                slot = self._random.randrange(calls)
+                if slot < MAX_SAMPLES:
+                    samples[slot] = per_item
+
+    def count(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    @contextmanager
+    def timer(self, stage, items=1):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start, items)
+
+    def elapsed(self):
+        return time.perf_counter() - self._started
+
+    def totals(self):
+        with self._lock:
+            return dict(self._stages)
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def stages(self):
+        """Per stage: seconds, count, and p50/p95/max milliseconds per item."""
+        with self._lock:
+            stages = {stage: (totals, sorted(self._samples.get(stage, ()))) for stage, totals in self._stages.items()}
+        return {
+            stage: {
+                "seconds": round(total, 3),
+                "count": count,
+                "p50_ms": round(1000 * percentile(samples, 50), 3),
+                "p95_ms": round(1000 * percentile(samples, 95), 3),
+                "max_ms": round(1000 * samples[-1], 3) if samples else 0.0,
+            }
+            for stage, ((total, count), samples) in stages.items()
+        }
+
+    def save_json(self, path, **extra):
+        """Writes elapsed time, stages and counters (plus `extra` keys) to `path`."""
+        data = {"elapsed_seconds": round(self.elapsed(), 3), "stages": self.stages(), "counters": self.counters(), **extra}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+        return path
+
+    def report(self, label="items", processed=None):
+        """
+        Returns human-readable summary lines.
+
+        Per-stage rates are per worker (items / busy seconds). When
+        `processed` is given, an overall wall-clock rate is added.
+        """
+        lines = []
+        stages = self.stages()
+        for stage, (total, count) in self.totals().items():
+            s = stages[stage]
+            rate = count / total if total > 0 else 0.0
+            avg_ms = 1000 * total / count if count else 0.0
+            lines.append(f"{stage}: {count} in {total:.2f}s ({rate:.1f}/s, {avg_ms:.1f} ms avg, "
+                         f"p50 {s['p50_ms']:.1f} ms, p95 {s['p95_ms']:.1f} ms)")
+        for name, value in self.counters().items():
+            lines.append(f"{name}: {value}")
+        if processed is not None:
+            wall = self.elapsed()
+            rate = processed / wall if wall > 0 else 0.0
+            lines.append(f"Total: {processed} {label} in {wall:.2f}s ({rate:.2f} {label}/s)")
+        return lines
@@ -0,0 +1,6 @@
+# conftest.py
+import sys
+from pathlib import Path
+
+# The app runs from src/ as a flat set of modules (python src/main.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,56 @@
+# test_dedup.py
+import shutil
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from phash_index import FolderHashes
+from scan_pipeline import ScanRecord, dedup_stage
+from stage_stats import StageStats
+
+
+def write_photo(path, seed):
+    pixels = np.random.default_rng(seed).integers(0, 256, (96, 64, 3), dtype=np.uint8)
+    Image.fromarray(pixels).resize((300, 420), Image.BILINEAR).save(path)
+
+
+@pytest.fixture
+def batch(tmp_path):
+    """Two byte-identical photos and a different one, with an empty output images/ folder."""
+    in_dir, images_dir = tmp_path / "in", tmp_path / "out" / "images"
+    in_dir.mkdir()
+    images_dir.mkdir(parents=True)
+    write_photo(in_dir / "a.png", seed=1)
+    shutil.copy(in_dir / "a.png", in_dir / "b.png")
+    write_photo(in_dir / "c.png", seed=2)
+    return [in_dir / name for name in ("a.png", "b.png", "c.png")], images_dir
+
+
+def run_dedup(paths, images_dir, mode, resumed=()):
+    records = [ScanRecord(i, path, {} if path in resumed else None, None, path in resumed) for i, path in enumerate(paths, start=1)]
+    return list(dedup_stage(iter(records), FolderHashes(images_dir), mode, StageStats()))
+
+
+def test_identical_copy_in_fresh_run_is_flagged(batch):
+    paths, images_dir = batch
+    first, copy, other = run_dedup(paths, images_dir, "flag")
+    assert first.duplicate_of is None
+    assert copy.duplicate_of == str(paths[0])
+    assert not copy.skipped
+    assert other.duplicate_of is None
+
+
+def test_identical_copy_in_fresh_run_is_skipped(batch):
+    paths, images_dir = batch
+    first, copy, other = run_dedup(paths, images_dir, "skip")
+    assert not first.skipped
+    assert copy.skipped and copy.duplicate_of == str(paths[0])
+    assert not other.skipped
+
+
+def test_copy_of_resumed_image_is_flagged(batch):
+    paths, images_dir = batch
+    first, copy, _ = run_dedup(paths, images_dir, "flag", resumed={paths[0]})
+    assert first.resumed and first.duplicate_of is None
+    assert copy.duplicate_of == str(paths[0])
@@ -0,0 +1,68 @@
+# test_ocr_stage.py
+from concurrent.futures import Future
+from pathlib import Path
+
+from scan_pipeline import ScanRecord, ocr_stage
+from stage_stats import StageStats
+
+CAPTURE = [["Name", [0, 0, 10, 10], "MTG"]]
+
+
+class InlineEngine:
+    """ScanEngine stand-in that "OCRs" an image to its file name without running any job until collected."""
+
+    max_in_flight = 2
+
+    def __init__(self):
+        self.stats = StageStats()
+        self.submitted = []
+
+    def ocr_config(self):
+        return "inline"
+
+    def submit(self, img_path, boxes, steps=None, reduction=1, align=False):
+        self.submitted.append(img_path)
+        future = Future()
+        future.img_path = img_path
+        return future
+
+    def collect(self, future):
+        return [future.img_path.stem]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def make_records(names, pulled):
+    for idx, name in enumerate(names, start=1):
+        pulled.append(name)
+        resumed = name.startswith("old")
+        yield ScanRecord(idx, Path(name + ".png"), {"input_path": name} if resumed else None, None, resumed)
+
+
+def test_finished_records_stream_without_waiting_for_ocr():
+    pulled = []
+    stage = ocr_stage(InlineEngine(), make_records([f"old{i}" for i in range(50)], pulled), CAPTURE, [()])
+    first = next(stage)
+    assert first.img_path.name == "old0.png"
+    assert len(pulled) == 1
+
+
+def test_output_order_and_in_flight_bound():
+    engine = InlineEngine()
+    pulled = []
+    names = ["new0", "old0", "new1", "new2", "old1", "new3", "new4"]
+    stage = ocr_stage(engine, make_records(names, pulled), CAPTURE, [()])
+    first = next(stage)
+    assert first.entry["Name"] == "new0"
+    # Stopped pulling once max_in_flight jobs were pending
+    assert len(engine.submitted) <= engine.max_in_flight
+    rest = list(stage)
+    assert [record.img_path.stem for record in [first] + rest] == names
+    assert [record.entry["Name"] for record in rest if not record.resumed] == ["new1", "new2", "new3", "new4"]
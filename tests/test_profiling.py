@@ -0,0 +1,42 @@
+# test_profiling.py
+import csv
+import pstats
+import time
+
+from price_lookup import update_csv_with_prices
+from price_providers import PriceProvider
+
+
+class SlowProvider(PriceProvider):
+    """Prices every card after a short pause, so lookups overlap on the worker threads."""
+
+    def name(self):
+        return "Slow"
+
+    def fetch_price(self, card_name):
+        time.sleep(0.02)
+        return slow_price(card_name)
+
+
+def slow_price(card_name):
+    return float(sum(ord(c) for c in card_name) % 100)
+
+
+def test_profiled_lookup_with_several_workers(tmp_path):
+    csv_path = tmp_path / "report.csv"
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Name"])
+        writer.writerows([f"Card {i}"] for i in range(24))
+
+    summary = {}
+    output_path = update_csv_with_prices(csv_path, SlowProvider(), "Name", workers=4, rate_limit=1000,
+                                         summary=summary, profile=True)
+
+    with open(output_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))[1:]
+    assert [row[-1] for row in rows] == [str(slow_price(row[0])) for row in rows]
+    assert summary["priced"] == 24
+
+    profiled = {func[2] for func in pstats.Stats(summary["profile_path"]).stats}
+    assert "slow_price" in profiled
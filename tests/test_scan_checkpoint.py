@@ -0,0 +1,68 @@
+# test_scan_checkpoint.py
+import shutil
+
+import pytest
+
+from scan_checkpoint import ScanManifest, file_digest
+from scan_pipeline import checkpoint_stage
+from stage_stats import StageStats
+
+CAPTURE = [["Name", [0, 0, 10, 10], "MTG"]]
+
+
+@pytest.fixture
+def folders(tmp_path):
+    """Two byte-identical inputs and an output folder holding each one's renamed copy."""
+    in_dir, out_dir = tmp_path / "in", tmp_path / "out"
+    (out_dir / "images").mkdir(parents=True)
+    in_dir.mkdir()
+    (in_dir / "card0.png").write_bytes(b"same card")
+    shutil.copy(in_dir / "card0.png", in_dir / "card9.png")
+    return in_dir, out_dir
+
+
+def first_run(in_dir, out_dir):
+    """Records card0 as Sol_Ring.png and card9, a flagged copy of it, as Sol_Ring_6.png."""
+    manifest = ScanManifest(out_dir, CAPTURE)
+    for name, output, duplicate_of in (("card0.png", "Sol_Ring.png", None), ("card9.png", "Sol_Ring_6.png", "card0.png")):
+        path = in_dir / name
+        (out_dir / "images" / output).write_bytes(path.read_bytes())
+        entry = {"input_path": str(path), "Name": "Sol Ring", "output_path": str(out_dir / "images" / output)}
+        if duplicate_of:
+            entry["Duplicate Of"] = str(in_dir / duplicate_of)
+        manifest.record(file_digest(path), entry)
+    manifest.close()
+
+
+def resume(paths, out_dir):
+    manifest = ScanManifest(out_dir, CAPTURE)
+    try:
+        return list(checkpoint_stage(paths, manifest, StageStats()))
+    finally:
+        manifest.close()
+
+
+def test_identical_inputs_resume_their_own_entries(folders):
+    in_dir, out_dir = folders
+    first_run(in_dir, out_dir)
+
+    card0, card9 = resume([in_dir / "card0.png", in_dir / "card9.png"], out_dir)
+    assert card0.resumed and card9.resumed
+    assert card0.entry["output_path"].endswith("Sol_Ring.png")
+    assert "Duplicate Of" not in card0.entry
+    assert card9.entry["output_path"].endswith("Sol_Ring_6.png")
+    assert card9.entry["Duplicate Of"] == str(in_dir / "card0.png")
+
+
+def test_renamed_input_takes_over_its_old_record_once(folders):
+    in_dir, out_dir = folders
+    first_run(in_dir, out_dir)
+    (in_dir / "card9.png").rename(in_dir / "renamed.png")
+    shutil.copy(in_dir / "card0.png", in_dir / "new_copy.png")
+
+    card0, renamed, new_copy = resume([in_dir / "card0.png", in_dir / "renamed.png", in_dir / "new_copy.png"], out_dir)
+    assert card0.entry["output_path"].endswith("Sol_Ring.png")
+    assert renamed.resumed and renamed.entry["output_path"].endswith("Sol_Ring_6.png")
+    assert renamed.entry["input_path"] == str(in_dir / "renamed.png")
+    # Every earlier record is taken, so the new copy is scanned
+    assert not new_copy.resumed